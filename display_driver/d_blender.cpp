@@ -42,6 +42,8 @@
 #endif
 
 #include <atomic>
+#include <mutex>
+#include <algorithm>
 
 typedef bool (*FuncPtr)();
 FuncPtr tag_redraw_func;
@@ -54,6 +56,8 @@ struct BlenderImage
         isXpu = false;
         framebuffer = nullptr;
         denoiseFrameBuffer = nullptr;
+        hasDirtyRegion = false;
+        bufferUpdated = false;
     }
 
     int width;
@@ -90,6 +94,16 @@ struct BlenderImage
     size_t noutputs;
     std::atomic<bool> bufferUpdated;
 
+    // Union of the regions that have been written to since the last
+    // call to GetDirtyFloatFramebuffer. These are in framebuffer
+    // coordinates (i.e.: rows are already flipped)
+    bool hasDirtyRegion;
+    int dirtyXMin;
+    int dirtyXMax;
+    int dirtyYMin;
+    int dirtyYMax;
+    std::mutex dirtyMutex;
+
     // These two aren't currently used
     // but are needed if we decide to use a
     // fragment shader
@@ -132,6 +146,31 @@ private:
 
 static std::vector<BlenderImage*> s_blenderImages;
 
+// Add the given region to the dirty region of this image
+void AddDirtyRegion(BlenderImage* blenderImage, int xmin, int xmax, int ymin, int ymax)
+{
+    std::lock_guard<std::mutex> lock(blenderImage->dirtyMutex);
+    if (!blenderImage->hasDirtyRegion)
+    {
+        blenderImage->dirtyXMin = xmin;
+        blenderImage->dirtyXMax = xmax;
+        blenderImage->dirtyYMin = ymin;
+        blenderImage->dirtyYMax = ymax;
+        blenderImage->hasDirtyRegion = true;
+        return;
+    }
+    blenderImage->dirtyXMin = std::min(blenderImage->dirtyXMin, xmin);
+    blenderImage->dirtyXMax = std::max(blenderImage->dirtyXMax, xmax);
+    blenderImage->dirtyYMin = std::min(blenderImage->dirtyYMin, ymin);
+    blenderImage->dirtyYMax = std::max(blenderImage->dirtyYMax, ymax);
+}
+
+// Mark the whole image as dirty
+void SetFullDirtyRegion(BlenderImage* blenderImage)
+{
+    AddDirtyRegion(blenderImage, 0, blenderImage->width-1, 0, blenderImage->height-1);
+}
+
 bool DenoiseBuffer(BlenderImage* blenderImage)
 {
 #ifndef OSX
@@ -309,6 +348,87 @@ void GetFloatFramebuffer(size_t pos, size_t pybuffersize, float* pybuffer)
     memcpy(pybuffer, blenderImage->framebuffer, sizeof(float) * pybuffersize);
 }
 
+// Mark the whole framebuffer as dirty, so that the next call to
+// GetDirtyFloatFramebuffer copies everything
+PRMANEXPORT
+void SetFramebufferDirty(size_t pos)
+{
+    if (s_blenderImages.empty() || pos >= s_blenderImages.size())
+        return;
+
+    BlenderImage* blenderImage = s_blenderImages[pos];
+    
+    if (blenderImage == nullptr)
+        return;
+
+    SetFullDirtyRegion(blenderImage);
+}
+
+// Copy only the dirty region of the framebuffer into pybuffer, and reset the
+// dirty region. pybuffer is expected to be the same size and layout as the framebuffer, 
+// and to hold the pixels from previous calls. Returns false if nothing was copied.
+PRMANEXPORT
+bool GetDirtyFloatFramebuffer(size_t pos, size_t pybuffersize, float* pybuffer)
+{
+    if (s_blenderImages.empty() || pos >= s_blenderImages.size())
+        return false;
+
+    BlenderImage* blenderImage = s_blenderImages[pos];
+    
+    if (blenderImage == nullptr)
+        return false;
+
+    int xMin, xMax, yMin, yMax;
+    {
+        std::lock_guard<std::mutex> lock(blenderImage->dirtyMutex);
+        if (!blenderImage->hasDirtyRegion)
+            return false;
+        xMin = blenderImage->dirtyXMin;
+        xMax = blenderImage->dirtyXMax;
+        yMin = blenderImage->dirtyYMin;
+        yMax = blenderImage->dirtyYMax;
+        blenderImage->hasDirtyRegion = false;
+    }
+
+    size_t bytesize = sizeof(float) * pybuffersize;
+    if (bytesize > blenderImage->size)
+        bytesize = blenderImage->size;
+
+    if (DenoiseBuffer(blenderImage)) {
+        // the denoiser works on the whole image
+        memcpy(pybuffer, blenderImage->denoiseFrameBuffer, bytesize);
+        return true;
+    }
+
+    xMin = std::max(xMin, 0);
+    yMin = std::max(yMin, 0);
+    xMax = std::min(xMax, blenderImage->width-1);
+    yMax = std::min(yMax, blenderImage->height-1);
+    if (xMin > xMax || yMin > yMax)
+        return false;
+
+    if (xMin == 0 && xMax == blenderImage->width-1)
+    {
+        // full rows, copy in one go
+        size_t offset = size_t(yMin) * blenderImage->width * blenderImage->entrysize;
+        size_t length = size_t(yMax - yMin + 1) * blenderImage->width * blenderImage->entrysize;
+        if (offset + length > bytesize)
+            return false;
+        memcpy((unsigned char*) pybuffer + offset, blenderImage->framebuffer + offset, length);
+        return true;
+    }
+
+    size_t rowlength = size_t(xMax - xMin + 1) * blenderImage->entrysize;
+    for (int y = yMin; y <= yMax; ++y)
+    {
+        size_t offset = (size_t(y) * blenderImage->width + xMin) * blenderImage->entrysize;
+        if (offset + rowlength > bytesize)
+            break;
+        memcpy((unsigned char*) pybuffer + offset, blenderImage->framebuffer + offset, rowlength);
+    }
+    return true;
+}
+
 // Return the active region that RenderMan is currently working on
 PRMANEXPORT
 void GetActiveRegion(size_t pos, int& arXMin, int& arXMax, int& arYMin, int& arYMax)
@@ -571,6 +691,7 @@ DspyImageOpen(
     /* Reserve a framebuffer */
     blenderImage->size = blenderImage->width * blenderImage->height * blenderImage->entrysize;
     blenderImage->framebuffer = (unsigned char*) std::malloc(blenderImage->size);
+    SetFullDirtyRegion(blenderImage);
 
     *ppvImage = blenderImage;
     s_blenderImages.push_back(blenderImage);
@@ -677,6 +798,14 @@ DspyImageData(
     blenderImage->arXMax = blenderImage->cropXMin + xmax_plus_1 - 1;
     blenderImage->arYMin = blenderImage->cropYMin + ymin;
     blenderImage->arYMax = blenderImage->cropYMin + ymax_plus_1 - 1;
+
+    // rows are flipped in the framebuffer
+    AddDirtyRegion(blenderImage, 
+                   blenderImage->arXMin,
+                   blenderImage->arXMax,
+                   (blenderImage->height-1) - blenderImage->arYMax,
+                   (blenderImage->height-1) - blenderImage->arYMin);
+    blenderImage->bufferUpdated = true;
     if( blenderImage->arXMin != 0 || 
         blenderImage->arXMax != blenderImage->width-1 || 
         blenderImage->arYMin != 0 || 
@@ -884,6 +1013,7 @@ void DisplayBlender::Notify(const uint32_t iteration,
         return;
     }
     CopyXpuBuffer(m_image);
+    SetFullDirtyRegion(m_image);
     m_image->bufferUpdated = true;
     if (tag_redraw_func)
     {
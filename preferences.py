@@ -73,6 +73,7 @@ __DEFAULTS__ = {
     'rman_show_advanced_params': False,      
     'rman_config_dir': "",
     'rman_viewport_refresh_rate': 0.01,
+    'rman_viewport_half_float': False,
     'rman_solo_collapse_nodes': True,
     'rman_use_blend_dir_token': True,          
     'rman_ui_framework': "QT",
@@ -93,6 +94,8 @@ __DEFAULTS__ = {
     'rman_roz_stats_print_level': '1',
     'rman_enhance_zoom_factor': 5,
     'rman_parent_lightfilter': False,
+    'rman_export_threads': 0,
+    'rman_hair_batch_size': 256,
     'rman_tractor_hostname': 'tractor-engine',
     'rman_tractor_port': 80,
     'rman_tractor_local_user': True,
@@ -509,6 +512,12 @@ class RendermanPreferences(AddonPreferences):
         max=0.1
     )    
 
+    rman_viewport_half_float: BoolProperty(
+        name="Half Float Viewport Texture",
+        description="Upload the IPR viewport image to the GPU as a half float texture. This halves the amount of data sent to the GPU on every redraw, at the cost of some precision.",
+        default=False
+    )
+
     rman_solo_collapse_nodes: BoolProperty(
         name="Collapse Non-Solo Nodes",
         default=True,
@@ -600,6 +609,20 @@ class RendermanPreferences(AddonPreferences):
         max=10
     )    
 
+    rman_export_threads: IntProperty(
+        name="Export Threads",
+        description="Number of threads used to process geometry when exporting the scene. A value of 0 uses all available cores. Set to 1 to disable threaded export",
+        default=0,
+        min=0, max=256
+    )
+
+    rman_hair_batch_size: IntProperty(
+        name="Hair Batch Size (MB)",
+        description="Approximate amount of memory, in megabytes, used for each batch of curves when exporting hair. Each batch is built and exported as a separate curves primitive before the next batch is built. Larger values give fewer, larger primitives at the cost of higher peak memory",
+        default=256,
+        min=1, max=16384
+    )
+
     rman_parent_lightfilter: BoolProperty(
         name="Parent Filter to Light",
         default=False,
@@ -810,6 +833,14 @@ class RendermanPreferences(AddonPreferences):
         col.prop(self, "rman_txmanager_keep_extension")
         col.prop(self, "rman_txmanager_tex_extensions")
 
+        # Scene Export
+        row = layout.row()
+        row.label(text='Scene Export', icon_value=rman_r_icon.icon_id)
+        row = layout.row()
+        col = row.column()
+        col.prop(self, 'rman_export_threads')
+        col.prop(self, 'rman_hair_batch_size')
+
         # UI Prefs
         row = layout.row()
         row.label(text='UI', icon_value=rman_r_icon.icon_id)
@@ -898,6 +929,7 @@ class RendermanPreferences(AddonPreferences):
             col.label(text='Other', icon_value=rman_r_icon.icon_id)
 
             col.prop(self, 'rman_viewport_refresh_rate')  
+            col.prop(self, 'rman_viewport_half_float')
             col.prop(self, 'rman_config_dir')   
             if self.rman_do_preview_renders:
                 col.prop(self, 'rman_preview_renders_minSamples')
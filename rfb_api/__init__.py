@@ -171,6 +171,7 @@ def create_displacement(material):
         return None
     if output.inputs['displace_in'].is_linked:
         return output.inputs['displace_in'].links[0].from_node
+    rman_bl_nodes.ensure_node_type('PxrDisplaceDisplaceNode')
     disp = nt.nodes.new('PxrDisplaceDisplaceNode')
     nt.links.new(disp.outputs['displace_out'], output.inputs['displace_in'])        
     return disp
@@ -209,7 +210,9 @@ def create_pattern(node_type, material):
 
     '''  
     nt = material.node_tree
-    pattern = nt.nodes.new('%sPatternNode' % node_type)
+    typename = '%sPatternNode' % node_type
+    rman_bl_nodes.ensure_node_type(typename)
+    pattern = nt.nodes.new(typename)
     return pattern
 
 def connect_nodes(output_node, output_socket, input_node, input_socket):
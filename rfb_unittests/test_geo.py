@@ -1,6 +1,9 @@
 import unittest
 import bpy
+import numpy as np
 from ..rfb_utils import mesh_utils
+from ..rfb_utils import hair_utils
+from .. import rman_rib_export
 from ..rman_constants import BLENDER_41
 
 
@@ -9,6 +12,11 @@ class GeoTest(unittest.TestCase):
     @classmethod
     def add_tests(self, suite):
         suite.addTest(GeoTest('test_mesh_export'))
+        suite.addTest(GeoTest('test_mats_faces'))
+        suite.addTest(GeoTest('test_end_point_indices'))
+        suite.addTest(GeoTest('test_tapered_widths'))
+        suite.addTest(GeoTest('test_curve_batches'))
+        suite.addTest(GeoTest('test_rib_export_chunks'))
 
     def test_mesh_export(self):
 
@@ -37,4 +45,68 @@ class GeoTest(unittest.TestCase):
         self.assertEqual(mesh, mesh_test)
         bpy.ops.object.delete()
 
-        
+    def test_mats_faces(self):
+        mats_faces = mesh_utils.get_mats_faces(np.array([1, 0, 1, 2, 0, 1], dtype=np.int32))
+        self.assertEqual(sorted(mats_faces.keys()), [0, 1, 2])
+        self.assertEqual(mats_faces[0].tolist(), [1, 4])
+        self.assertEqual(mats_faces[1].tolist(), [0, 2, 5])
+        self.assertEqual(mats_faces[2].tolist(), [3])
+        self.assertEqual(mats_faces[1].dtype, np.int32)
+
+        self.assertEqual(mesh_utils.get_mats_faces(np.array([], dtype=np.int32)), dict())
+
+    def test_end_point_indices(self):
+        # two curves, one with 3 points starting at 0, one with 2 points starting at 5
+        indices, nverts = hair_utils.get_end_point_indices(np.array([0, 5]), np.array([3, 2]))
+        self.assertEqual(indices.tolist(), [0, 0, 1, 2, 2, 5, 5, 6, 6])
+        self.assertEqual(nverts.tolist(), [5, 4])
+        self.assertEqual(nverts.dtype, np.int32)
+
+    def test_tapered_widths(self):
+        # the end points are doubled, so they get the base and tip widths
+        widths = hair_utils.get_tapered_widths(np.array([5, 4]), 1.0, 0.0)
+        expected = [1.0, 1.0, 2.0/3.0, 1.0/3.0, 0.0, 1.0, 1.0, 0.5, 0.0]
+        self.assertEqual(widths.dtype, np.float32)
+        self.assertTrue(np.allclose(widths, expected))
+
+    def test_curve_batches(self):
+        nverts = np.array([4, 4, 4, 4, 4], dtype=np.int32)
+
+        # every curve fits in one batch
+        self.assertEqual(hair_utils.get_curve_batches(nverts, 100), [(0, 5)])
+
+        # a new batch is started once a batch has more than max_verts
+        self.assertEqual(hair_utils.get_curve_batches(nverts, 8), [(0, 3), (3, 5)])
+
+        # a curve bigger than max_verts still gets a batch
+        self.assertEqual(hair_utils.get_curve_batches(np.array([10, 2], dtype=np.int32), 4), [(0, 1), (1, 2)])
+
+        self.assertEqual(hair_utils.get_curve_batches(np.array([], dtype=np.int32), 4), [])
+
+    def test_rib_export_chunks(self):
+        scene = bpy.context.scene
+        frame_start = scene.frame_start
+        frame_end = scene.frame_end
+        frame_step = scene.frame_step
+
+        try:
+            # uneven split
+            scene.frame_start = 1
+            scene.frame_end = 10
+            scene.frame_step = 1
+            workers = rman_rib_export.RmanRibExportWorkers(None, scene, '', '')
+            chunks = workers.get_chunks(3)
+            self.assertEqual(chunks, [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10]])
+
+            # frame step
+            scene.frame_step = 3
+            workers = rman_rib_export.RmanRibExportWorkers(None, scene, '', '')
+            chunks = workers.get_chunks(2)
+            self.assertEqual(chunks, [[1, 4], [7, 10]])
+
+            # more workers than frames
+            self.assertEqual(workers.get_chunks(8), [[1], [4], [7], [10]])
+        finally:
+            scene.frame_start = frame_start
+            scene.frame_end = frame_end
+            scene.frame_step = frame_step
@@ -0,0 +1,89 @@
+from .prefs_utils import get_pref
+import numpy as np
+
+# Upper limit on the number of vertices in a batch. Keeps the
+# number of floats for P under the max int array length.
+__RMAN_MAX_BATCH_VERTS__ = (2**31 - 1) // 3
+
+def get_end_point_indices(starts, npoints):
+    '''
+    Build an index array that gathers the points of a set of curves into one
+    contiguous array, duplicating the first and last point of each curve (as
+    needed by catmull-rom curves).
+
+    Arguments:
+    starts (np.ndarray) - index of the first point of each curve in the source points
+    npoints (np.ndarray) - number of points for each curve
+
+    Returns:
+    (np.ndarray, np.ndarray) - the gather indices into the source points, and the
+    number of vertices for each curve (npoints + 2)
+    '''
+    npoints = np.asarray(npoints, dtype=np.int64)
+    nverts = npoints + 2
+    curve_starts = np.cumsum(nverts) - nverts
+    local = np.arange(int(nverts.sum()), dtype=np.int64) - np.repeat(curve_starts, nverts)
+    local = np.minimum(np.maximum(local - 1, 0), np.repeat(npoints - 1, nverts))
+    indices = np.repeat(np.asarray(starts, dtype=np.int64), nverts) + local
+    return indices, nverts.astype(np.int32)
+
+def get_tapered_widths(nverts, base_width, tip_width):
+    '''
+    Compute per-vertex widths that linearly go from base_width to tip_width
+    along each curve.
+
+    Arguments:
+    nverts (np.ndarray) - number of vertices for each curve. Must be 3 or more.
+    base_width (float) - width at the root of the curves
+    tip_width (float) - width at the tip of the curves
+
+    Returns:
+    (np.ndarray) - float32 array of widths, one for each vertex
+    '''
+    nverts = np.asarray(nverts, dtype=np.int64)
+    curve_starts = np.cumsum(nverts) - nverts
+    local = np.arange(int(nverts.sum()), dtype=np.int64) - np.repeat(curve_starts, nverts)
+    decr = (base_width - tip_width) / (nverts - 2)
+    widths = base_width - np.repeat(decr, nverts) * (local - 1)
+    widths[local == 0] = base_width
+    widths[local == np.repeat(nverts - 1, nverts)] = tip_width
+    return widths.astype(np.float32)
+
+def get_max_batch_verts(bytes_per_vert):
+    '''
+    Get the maximum number of vertices a batch of curves can have, based on
+    the rman_hair_batch_size preference.
+
+    Arguments:
+    bytes_per_vert (int) - approximate number of bytes each vertex uses across all of the primvars
+
+    Returns:
+    (int) - maximum number of vertices per batch
+    '''
+    budget = get_pref('rman_hair_batch_size', default=256) * 1024 * 1024
+    max_verts = max(int(budget // max(bytes_per_vert, 1)), 4)
+    return min(max_verts, __RMAN_MAX_BATCH_VERTS__)
+
+def get_curve_batches(nverts, max_verts):
+    '''
+    Split a set of curves into consecutive batches. A new batch is started
+    once a batch has more than max_verts vertices.
+
+    Arguments:
+    nverts (np.ndarray) - number of vertices for each curve
+    max_verts (int) - maximum number of vertices in a batch
+
+    Returns:
+    (list) - list of (first curve, last curve + 1) tuples
+    '''
+    ncurves = len(nverts)
+    csum = np.cumsum(nverts)
+    batches = []
+    start = 0
+    while start < ncurves:
+        base = csum[start-1] if start > 0 else 0
+        end = int(np.searchsorted(csum, base + max_verts, side='right')) + 1
+        end = min(end, ncurves)
+        batches.append((start, end))
+        start = end
+    return batches
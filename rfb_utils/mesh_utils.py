@@ -9,53 +9,58 @@ class RmanMesh:
         self.N = args[3]
 
     def __eq__(self, other):
-        if self.nverts != other.nverts or self.verts != other.verts or self.P != other.P or self.N != other.N:
-            return False
+        # members can either be lists or numpy arrays
+        for a, b in [(self.nverts, other.nverts), (self.verts, other.verts), (self.P, other.P), (self.N, other.N)]:
+            if not np.array_equal(np.asarray(a), np.asarray(b)):
+                return False
         return True
 
 
-def get_mesh_points_(mesh):
+def get_mesh_points_(mesh, as_array=False):
     '''
     Get just the points for the input mesh.
 
     Arguments:
     mesh (bpy.types.Mesh) - Blender mesh
+    as_array (bool) - return a contiguous (n, 3) float32 numpy array instead of a list
 
     Returns:
-    (list) - the points on the mesh
+    (list/np.ndarray) - the points on the mesh
     '''
 
     nvertices = len(mesh.vertices)
     P = np.zeros(nvertices*3, dtype=np.float32)
     mesh.vertices.foreach_get('co', P)
     P = np.reshape(P, (nvertices, 3))
+    if as_array:
+        return P
     return P.tolist()
 
-def get_mesh(mesh, get_normals=False):
+def get_mesh(mesh, get_normals=False, as_arrays=False):
     '''
     Get the basic primvars needed to render a mesh.
 
     Arguments:
     mesh (bpy.types.Mesh) - Blender mesh
     get_normals (bool) - Whether or not normals are needed
+    as_arrays (bool) - keep the primvars as contiguous float32/int32 numpy arrays, 
+                       rather than converting them to lists
 
     Returns:
-    (list) - this includes nverts (the number of vertices for each face), 
+    (RmanMesh) - this includes nverts (the number of vertices for each face), 
             vertices list, points, and normals
     '''
 
-    P = get_mesh_points_(mesh)
+    P = get_mesh_points_(mesh, as_array=True)
     N = []    
 
     npolygons = len(mesh.polygons)
     fastnvertices = np.zeros(npolygons, dtype=np.int32)
     mesh.polygons.foreach_get('loop_total', fastnvertices)
-    nverts = fastnvertices.tolist()
 
     loops = len(mesh.loops)
     fastvertices = np.zeros(loops, dtype=np.int32)
     mesh.loops.foreach_get('vertex_index', fastvertices)
-    verts = fastvertices.tolist()
 
     if get_normals:
         if BLENDER_41:
@@ -63,8 +68,7 @@ def get_mesh(mesh, get_normals=False):
             # It's recommended to always use the corner_normals collection
             fastnormals = np.zeros(loops*3, dtype=np.float32)
             mesh.corner_normals.foreach_get('vector', fastnormals)
-            fastnormals = np.reshape(fastnormals, (loops, 3))
-            N = fastnormals.tolist()                
+            N = np.reshape(fastnormals, (loops, 3))
         else:
             fastsmooth = np.zeros(npolygons, dtype=np.int32)
             mesh.polygons.foreach_get('use_smooth', fastsmooth)
@@ -73,14 +77,220 @@ def get_mesh(mesh, get_normals=False):
                 mesh.calc_normals_split()
                 fastnormals = np.zeros(loops*3, dtype=np.float32)
                 mesh.loops.foreach_get('normal', fastnormals)
-                fastnormals = np.reshape(fastnormals, (loops, 3))
-                N = fastnormals.tolist()   
+                N = np.reshape(fastnormals, (loops, 3))
 
-        if not N:
+        if len(N) == 0:
             fastnormals = np.zeros(npolygons*3, dtype=np.float32)
             mesh.polygons.foreach_get('normal', fastnormals)
-            fastnormals = np.reshape(fastnormals, (npolygons, 3))
-            N = fastnormals.tolist()
+            N = np.reshape(fastnormals, (npolygons, 3))
 
-    rman_mesh = RmanMesh(nverts, verts, P, N)
-    return rman_mesh
\ No newline at end of file
+    if as_arrays:
+        if len(N) == 0:
+            N = np.zeros((0, 3), dtype=np.float32)
+        return RmanMesh(fastnvertices, fastvertices, P, N)
+
+    if len(N) > 0:
+        N = N.tolist()
+    rman_mesh = RmanMesh(fastnvertices.tolist(), fastvertices.tolist(), P.tolist(), N)
+    return rman_mesh
+
+class RmanVertexGroupWeights:
+    '''
+    Sparse vertex group weights for a mesh. The weights for all of the 
+    vertex groups are read in a single pass over the vertices, and 
+    individual groups can then be sliced out with get_weights.
+
+    Attributes:
+        npoints (int) - number of vertices in the mesh
+        vertex_indices (np.ndarray) - vertex index of each weight, sorted by group (int32)
+        weights (np.ndarray) - the weights, sorted by group (float32)
+        group_ranges (dict) - vertex group index to (start, end) range into vertex_indices and weights
+    '''
+
+    def __init__(self, mesh):
+        self.npoints = len(mesh.vertices)
+        rows = []
+        cols = []
+        vals = []
+        for v in mesh.vertices:
+            idx = v.index
+            for g in v.groups:
+                rows.append(idx)
+                cols.append(g.group)
+                vals.append(g.weight)
+
+        cols = np.array(cols, dtype=np.int32)
+        order = np.argsort(cols, kind='stable')
+        self.vertex_indices = np.array(rows, dtype=np.int32)[order]
+        self.weights = np.array(vals, dtype=np.float32)[order]
+        self.group_ranges = dict()
+        group_ids, starts = np.unique(cols[order], return_index=True)
+        ends = np.append(starts[1:], len(cols))
+        for group_id, start, end in zip(group_ids.tolist(), starts.tolist(), ends.tolist()):
+            self.group_ranges[group_id] = (start, end)
+
+    def get_weights(self, group_index):
+        '''
+        Get the weight of every vertex for a vertex group. Vertices that
+        are not part of the group get a weight of 0.0.
+
+        Arguments:
+        group_index (int) - index of the vertex group
+
+        Returns:
+        (np.ndarray) - float32 array of weights, one per vertex
+        '''
+        weights = np.zeros(self.npoints, dtype=np.float32)
+        if group_index in self.group_ranges:
+            start, end = self.group_ranges[group_index]
+            weights[self.vertex_indices[start:end]] = self.weights[start:end]
+        return weights
+
+def get_mats_faces(material_ids):
+    '''
+    Group the faces of a mesh by their material index.
+
+    Arguments:
+    material_ids (np.ndarray) - the material index for each face
+
+    Returns:
+    (dict) - dictionary of material index to a sorted int32 array of face indices
+    '''
+    material_ids = np.asarray(material_ids)
+    if len(material_ids) == 0:
+        return dict()
+    # a stable sort keeps the face indices in increasing order within each group
+    order = np.argsort(material_ids, kind='stable').astype(np.int32)
+    mat_ids, starts = np.unique(material_ids[order], return_index=True)
+    return dict(zip(mat_ids.tolist(), np.split(order, starts[1:])))
+
+class RmanMeshPayload:
+    '''
+    RmanMeshPayload holds the buffers needed to translate a mesh. It's filled in two steps. 
+    First, the buffers are read from Blender (see RmanMeshTranslator.gather_payload), which 
+    has to happen on the main thread. Then, process() assembles the primvar buffers and 
+    details, the subdivision tags and the face sets. This doesn't need Blender, and is safe 
+    to run on a worker thread. All that's left for the main thread is handing the 
+    buffers to the RixParamList.
+
+    Attributes:
+        nverts (np.ndarray) - number of vertices for each face (int32)
+        verts (np.ndarray) - vertex indices (int32)
+        P (np.ndarray) - points, shape (npoints, 3) (float32)
+        N (np.ndarray) - normals, shape (n, 3) (float32)
+        st (np.ndarray) - flat uv array (float32), or None
+        Cs (np.ndarray) - vertex colors (float32), or None. RGBA, shape (n, 4), when gathered. 
+                          process() drops the alpha channel, leaving shape (n, 3)
+        st_detail (str) - detail for st, filled in by process(), or None if there are no uvs
+        Cs_detail (str) - detail for Cs, filled in by process(), or None if there are no colors
+        N_detail (str) - detail for N, filled in by process(), or None if there are no normals
+        material_ids (np.ndarray) - material index for each face (int32), or None
+        is_subdiv (bool) - whether this mesh is a subdivision mesh
+        use_subdiv_modifier (bool) - mesh was tagged as a subdiv by a modifier
+        subdiv_interp (int) - interpolateboundary value
+        subdiv_fvar_interp (int) - facevaryinginterpolateboundary value
+        creases (np.ndarray) - crease value for each edge (float32), or None
+        edge_verts (np.ndarray) - vertex indices for each edge, shape (nedges, 2) (int32), or None
+        subd_tags (tuple) - subdivision tags, filled in by process(): 
+                            (tags, nargs, intargs, floatargs, stringargs)
+        mat_faces (dict) - material index to int32 array of face indices, filled in by process()
+                           if material_ids is set
+        processed (bool) - whether process() has been called
+    '''
+
+    def __init__(self):
+        self.nverts = None
+        self.verts = None
+        self.P = None
+        self.N = None
+        self.st = None
+        self.Cs = None
+        self.st_detail = None
+        self.Cs_detail = None
+        self.N_detail = None
+        self.material_ids = None
+        self.is_subdiv = False
+        self.use_subdiv_modifier = False
+        self.subdiv_interp = 0
+        self.subdiv_fvar_interp = 0
+        self.creases = None
+        self.edge_verts = None
+        self.subd_tags = None
+        self.mat_faces = None
+        self.processed = False
+
+    @property
+    def npolys(self):
+        return len(self.nverts)
+
+    @property
+    def npoints(self):
+        return len(self.P)
+
+    @property
+    def numnverts(self):
+        return len(self.verts)
+
+    def process(self):
+        '''
+        Do any of the numpy work that doesn't need to access Blender data.
+        This must not touch bpy, as it can be called from a worker thread.
+
+        Returns:
+        (RmanMeshPayload) - self
+        '''
+        if self.processed:
+            return self
+
+        # make sure all of the buffers can be handed to the RixParamList as is
+        self.nverts = np.ascontiguousarray(self.nverts, dtype=np.int32)
+        self.verts = np.ascontiguousarray(self.verts, dtype=np.int32)
+        self.P = np.ascontiguousarray(self.P, dtype=np.float32)
+        numnverts = len(self.verts)
+
+        if len(self.N) > 0:
+            self.N = np.ascontiguousarray(self.N, dtype=np.float32)
+            self.N_detail = "facevarying" if len(self.N) == numnverts else "uniform"
+
+        if self.st is not None and len(self.st) > 0:
+            self.st = np.ascontiguousarray(self.st, dtype=np.float32)
+            self.st_detail = "facevarying" if (numnverts*2) == len(self.st) else "vertex"
+
+        if self.Cs is not None and len(self.Cs) > 0:
+            # drop the alpha channel
+            self.Cs = np.ascontiguousarray(np.reshape(self.Cs, (-1, 4))[:, 0:3], dtype=np.float32)
+            self.Cs_detail = "facevarying" if numnverts == len(self.Cs) else "vertex"
+
+        if self.is_subdiv:
+            self.subd_tags = self._build_subd_tags()
+        if self.material_ids is not None and self.mat_faces is None:
+            self.mat_faces = get_mats_faces(self.material_ids)
+        self.processed = True
+        return self
+
+    def _build_subd_tags(self):
+        tags = ['interpolateboundary', 'facevaryinginterpolateboundary']
+        nargs = [1, 0, 0, 1, 0, 0]
+        intargs = [self.subdiv_interp, self.subdiv_fvar_interp]
+        floatargs = []
+        stringargs = []
+
+        creases = self.creases
+        if creases is not None and (creases > 0.0).any():
+            # we have edges where their crease is > 0.0
+            # grab only those edges
+            crease_mask = creases > 0.0
+            crease_edges = self.edge_verts[crease_mask]
+
+            # squared, to match blender appareance better
+            #: range 0 - 10 (infinitely sharp)
+            creases = creases[crease_mask]
+            creases = creases * creases * 10.0
+            edges_subset_len = len(creases)
+
+            tags.extend(['crease'] * edges_subset_len)
+            nargs.extend([2, 1, 0] * edges_subset_len)
+            intargs.extend(crease_edges.flatten().tolist())
+            floatargs.extend(creases.tolist())
+
+        return (tags, nargs, intargs, floatargs, stringargs)
@@ -6,6 +6,24 @@ from . import string_utils
 # These types don't create instances
 _RMAN_NO_INSTANCES_ = ['EMPTY', 'EMPTY_INSTANCER', 'LIGHTFILTER']
 
+# Memoized prototype keys and group db names. The keys are pointers, 
+# which are only valid for the current depsgraph evaluation, so
+# clear_key_cache() needs to be called whenever the depsgraph is updated.
+__RMAN_KEY_CACHE__ = {
+    'prototype_key': dict(),
+    'group_db_name': dict(),
+    'use_gpu_subdiv': None
+}
+
+def clear_key_cache():
+    '''
+    Clear the memoized prototype keys and group db names. Should be called before 
+    exporting a scene, and at the start of every depsgraph update.
+    '''
+    __RMAN_KEY_CACHE__['prototype_key'].clear()
+    __RMAN_KEY_CACHE__['group_db_name'].clear()
+    __RMAN_KEY_CACHE__['use_gpu_subdiv'] = None
+
 def get_db_name(ob, rman_type='', psys=None):
     db_name = ''    
 
@@ -42,23 +60,34 @@ def get_db_name(ob, rman_type='', psys=None):
     return string_utils.sanitize_node_name(db_name)
 
 def get_group_db_name(ob_inst):
+    cache = __RMAN_KEY_CACHE__['group_db_name']
     if isinstance(ob_inst, bpy.types.DepsgraphObjectInstance):
         if ob_inst.is_instance:
             ob = ob_inst.instance_object
             parent = ob_inst.parent
             psys = ob_inst.particle_system
-            persistent_id = "%d%d" % (ob_inst.persistent_id[1], ob_inst.persistent_id[0])            
-            if psys:
-                group_db_name = "%s|%s|%s|%s" % (parent.name_full, ob.name_full, psys.name, persistent_id)
-            else:
-                group_db_name = "%s|%s|%s" % (parent.name_full, ob.name_full, persistent_id)
-        else:
-            ob = ob_inst.object
-            group_db_name = "%s" % (ob.name_full)
+            pid = ob_inst.persistent_id
+            key = (parent.as_pointer(), ob.as_pointer(), psys.as_pointer() if psys else 0, pid[0], pid[1])
+            group_db_name = cache.get(key, None)
+            if group_db_name is None:
+                persistent_id = "%d%d" % (pid[1], pid[0])            
+                if psys:
+                    group_db_name = "%s|%s|%s|%s" % (parent.name_full, ob.name_full, psys.name, persistent_id)
+                else:
+                    group_db_name = "%s|%s|%s" % (parent.name_full, ob.name_full, persistent_id)
+                group_db_name = string_utils.sanitize_node_name(group_db_name)
+                cache[key] = group_db_name
+            return group_db_name
+        ob = ob_inst.object
     else:
-        group_db_name = "%s" % (ob_inst.name_full)
+        ob = ob_inst
 
-    return string_utils.sanitize_node_name(group_db_name)
+    key = ob.as_pointer()
+    group_db_name = cache.get(key, None)
+    if group_db_name is None:
+        group_db_name = string_utils.sanitize_node_name("%s" % (ob.name_full))
+        cache[key] = group_db_name
+    return group_db_name
 
 def is_light_filter(ob):
     if ob is None:
@@ -179,7 +208,33 @@ def find_parent(ob):
 
 
 def prototype_key(ob):
-    use_gpu_subdiv = getattr(bpy.context.preferences.system, 'use_gpu_subdivision', False)
+    cache = __RMAN_KEY_CACHE__['prototype_key']
+    if isinstance(ob, bpy.types.DepsgraphObjectInstance):
+        if ob.is_instance:
+            # ob.object is a temporary object, that gets reused for every instance
+            # while iterating, so we can't use its pointer. Use the pointer to
+            # the data, or to the object being instanced, instead.
+            data = ob.object.data
+            if data:
+                key = ('DATA', ob.object.type, data.as_pointer())
+            else:
+                key = ('OBJECT', ob.object.type, ob.instance_object.as_pointer())
+        else:
+            key = ('DEPSGRAPH', ob.object.as_pointer())
+    else:
+        key = ('OBJECT', ob.as_pointer())
+
+    proto_key = cache.get(key, None)
+    if proto_key is None:
+        use_gpu_subdiv = __RMAN_KEY_CACHE__['use_gpu_subdiv']
+        if use_gpu_subdiv is None:
+            use_gpu_subdiv = getattr(bpy.context.preferences.system, 'use_gpu_subdivision', False)
+            __RMAN_KEY_CACHE__['use_gpu_subdiv'] = use_gpu_subdiv
+        proto_key = _prototype_key(ob, use_gpu_subdiv)
+        cache[key] = proto_key
+    return proto_key
+
+def _prototype_key(ob, use_gpu_subdiv):
     if isinstance(ob, bpy.types.DepsgraphObjectInstance):
         if ob.is_instance:
             if ob.object.data:
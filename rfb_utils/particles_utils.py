@@ -1,74 +1,153 @@
-from mathutils import Vector
+from . import primvar_utils
+import numpy as np
+import bpy
 
-def valid_particle(pa, valid_frames):
-    return pa.die_time >= valid_frames[-1] and pa.birth_time <= valid_frames[0]
+class RmanParticleSnapshot:
+    '''
+    Array backed snapshot of the particles in a particle system. Each field is read
+    once, with foreach_get, the first time it is asked for. All fields are
+    filtered with the same valid particle mask.
 
-def get_particles(ob, psys, inv_mtx, frame, valid_frames=None, get_next_P=False, get_width=True):
-    P = []
-    next_P = []
-    width = []
+    Attributes:
+    psys (bpy.types.ParticleSystem) - the particle system
+    count (int) - the total number of particles in psys
+    mask (np.ndarray) - boolean mask of the particles that are valid for valid_frames
+    indices (np.ndarray) - indices of the valid particles
+    '''
 
+    # number of components for each field we can read with foreach_get
+    __FIELDS__ = {
+        'location': 3,
+        'velocity': 3,
+        'angular_velocity': 3,
+        'size': 1,
+        'birth_time': 1,
+        'die_time': 1,
+        'lifetime': 1
+    }
+
+    def __init__(self, psys, valid_frames):
+        self.psys = psys
+        self.count = len(psys.particles)
+        self._fields = dict()
+        self.mask = (self._read('die_time') >= valid_frames[-1]) & (self._read('birth_time') <= valid_frames[0])
+        self.indices = np.flatnonzero(self.mask)
+
+    def __len__(self):
+        return len(self.indices)
+
+    def _read(self, name):
+        values = self._fields.get(name, None)
+        if values is None:
+            ncomps = RmanParticleSnapshot.__FIELDS__[name]
+            values = np.zeros(self.count * ncomps, dtype=np.float32)
+            self.psys.particles.foreach_get(name, values)
+            if ncomps > 1:
+                values = np.reshape(values, (self.count, ncomps))
+            self._fields[name] = values
+        return values
+
+    def get(self, name):
+        '''
+        Get the values of a field for the valid particles
+
+        Arguments:
+        name (str) - the name of the bpy.types.Particle property
+
+        Returns:
+        (np.ndarray) - float32 array of values
+        '''
+        return self._read(name)[self.mask]
+
+    def get_alive(self):
+        '''
+        Get a boolean mask of which of the valid particles are alive. alive_state
+        is an enum. Where foreach_get can read enums, it gives us the enum item 
+        values, which we compare against the value of the ALIVE item. Otherwise,
+        we need to look at each particle.
+
+        Returns:
+        (np.ndarray) - boolean array
+        '''
+        alive_state = self._fields.get('alive_state', None)
+        if alive_state is None:
+            alive_state = np.zeros(self.count, dtype=np.int32)
+            try:
+                self.psys.particles.foreach_get('alive_state', alive_state)
+            except (TypeError, RuntimeError):
+                particles = self.psys.particles
+                return np.array([particles[i].alive_state == 'ALIVE' for i in self.indices.tolist()], dtype=bool)
+            self._fields['alive_state'] = alive_state
+        alive = bpy.types.Particle.bl_rna.properties['alive_state'].enum_items['ALIVE'].value
+        return (alive_state == alive)[self.mask]
+
+def transform_points(mtx, points):
+    '''
+    Transform an array of points by a 4x4 matrix.
+
+    Arguments:
+    mtx (mathutils.Matrix) - the transformation matrix
+    points (np.ndarray) - array of points with shape (n, 3)
+
+    Returns:
+    (np.ndarray) - float32 array of transformed points
+    '''
+    m = np.array(mtx, dtype=np.float32)
+    return (points @ m[:3, :3].T + m[:3, 3]).astype(np.float32)
+
+def get_particles(ob, psys, inv_mtx, frame, valid_frames=None, get_next_P=False, get_width=True, snapshot=None):
     valid_frames = (frame,
                     frame) if valid_frames is None else valid_frames
-    
-    for pa in [p for p in psys.particles if valid_particle(p, valid_frames)]:
-        pt = inv_mtx @ pa.location
-        P.append(pt)
-        
-        if get_next_P:
-            # calculate the point for the next frame using velocity
-            vel = Vector(pa.velocity / pa.lifetime )
-            next_P.append( inv_mtx @ (Vector(pa.location) + vel))
-
-        if get_width:
-            if pa.alive_state != 'ALIVE':
-                width.append(0.0)
-            else:
-                width.append(pa.size)
-    return (P, next_P, width)    
-
-def get_primvars_particle(primvar, frame, psys, subframes, sample):
+    if snapshot is None:
+        snapshot = RmanParticleSnapshot(psys, valid_frames)
+
+    next_P = np.zeros((0, 3), dtype=np.float32)
+    width = np.zeros(0, dtype=np.float32)
+
+    location = snapshot.get('location')
+    P = transform_points(inv_mtx, location)
+
+    if get_next_P:
+        # calculate the point for the next frame using velocity
+        vel = snapshot.get('velocity') / snapshot.get('lifetime')[:, np.newaxis]
+        next_P = transform_points(inv_mtx, location + vel)
+
+    if get_width:
+        width = np.where(snapshot.get_alive(), snapshot.get('size'), 0.0).astype(np.float32)
+    return (P, next_P, width)
+
+def get_primvars_particle(primvar, frame, psys, subframes, sample, snapshot=None):
     rm = psys.settings.renderman
+    if not rm.prim_vars:
+        return
+
+    if snapshot is None:
+        snapshot = RmanParticleSnapshot(psys, subframes)
 
     for p in rm.prim_vars:
         pvars = []
 
         if p.data_source in ('VELOCITY', 'ANGULAR_VELOCITY'):
             if p.data_source == 'VELOCITY':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append(pa.velocity)
+                pvars = snapshot.get('velocity')
             elif p.data_source == 'ANGULAR_VELOCITY':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append(pa.angular_velocity)
+                pvars = snapshot.get('angular_velocity')
 
-            primvar.SetVectorDetail(p.name, pvars, "vertex", sample)
+            primvar_utils.set_primvar_detail(primvar, 'SetVectorDetail', p.name, pvars, "vertex", sample)
 
         elif p.data_source in \
                 ('SIZE', 'AGE', 'BIRTH_TIME', 'DIE_TIME', 'LIFE_TIME', 'ID'):
             if p.data_source == 'SIZE':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append(pa.size)
+                pvars = snapshot.get('size')
             elif p.data_source == 'AGE':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append((frame - pa.birth_time) / pa.lifetime)
+                pvars = (frame - snapshot.get('birth_time')) / snapshot.get('lifetime')
             elif p.data_source == 'BIRTH_TIME':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append(pa.birth_time)
+                pvars = snapshot.get('birth_time')
             elif p.data_source == 'DIE_TIME':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append(pa.die_time)
+                pvars = snapshot.get('die_time')
             elif p.data_source == 'LIFE_TIME':
-                for pa in \
-                        [p for p in psys.particles if valid_particle(p, subframes)]:
-                    pvars.append(pa.lifetime)
+                pvars = snapshot.get('lifetime')
             elif p.data_source == 'ID':
-                pvars = [id for id, p in psys.particles.items(
-                ) if valid_particle(p, subframes)]
-            
-            primvar.SetFloatDetail(p.name, pvars, "vertex", sample)  
\ No newline at end of file
+                pvars = snapshot.indices.astype(np.float32)
+
+            primvar_utils.set_primvar_detail(primvar, 'SetFloatDetail', p.name, pvars, "vertex", sample)
@@ -0,0 +1,86 @@
+import numpy as np
+
+# Keep track of which RixParamList setters accept buffer-protocol
+# objects (numpy arrays). Older prman builds only accept python lists,
+# in which case we fall back to converting the array to a list.
+__RMAN_BUFFER_SETTERS__ = dict()
+
+def as_float_buffer(data, ncomps=1):
+    '''
+    Return data as a contiguous float32 numpy array. If ncomps is greater than 1,
+    the array is reshaped to (n, ncomps).
+
+    Arguments:
+    data (list/np.ndarray) - input data
+    ncomps (int) - number of components per element
+
+    Returns:
+    (np.ndarray) - the float32 array
+    '''
+    arr = np.ascontiguousarray(data, dtype=np.float32)
+    if ncomps > 1:
+        arr = np.reshape(arr, (-1, ncomps))
+    return arr
+
+def as_int_buffer(data):
+    '''
+    Return data as a contiguous, flat int32 numpy array.
+
+    Arguments:
+    data (list/np.ndarray) - input data
+
+    Returns:
+    (np.ndarray) - the int32 array
+    '''
+    return np.ascontiguousarray(data, dtype=np.int32).ravel()
+
+def set_primvar_detail(rixparams, setter, name, data, *args):
+    '''
+    Call one of the RixParamList Set*Detail methods with a numpy array.
+    The array is handed to prman without converting to a python list,
+    if the prman build supports it. Otherwise, we fall back to calling
+    the setter with the array converted to a list.
+
+    Arguments:
+    rixparams (RixParamList) - the param list to set the primvar on
+    setter (str) - name of the RixParamList method, ex: 'SetPointDetail'
+    name (str) - name of the primvar
+    data (np.ndarray/list) - the primvar data
+    args - remaining arguments to pass to the setter (detail, arraysize, time sample, etc.)
+    '''
+    func = getattr(rixparams, setter)
+    if isinstance(data, np.ndarray):
+        if __RMAN_BUFFER_SETTERS__.get(setter, True):
+            try:
+                func(name, np.ascontiguousarray(data), *args)
+                __RMAN_BUFFER_SETTERS__[setter] = True
+                return
+            except (TypeError, ValueError):
+                __RMAN_BUFFER_SETTERS__[setter] = False
+        data = data.tolist()
+    func(name, data, *args)
+
+def set_array(rixparams, setter, name, data, *args):
+    '''
+    Same as set_primvar_detail, but for the non-detail RixParamList setters
+    that take an explicit length, ex: SetIntegerArray, SetFloatArray.
+
+    Arguments:
+    rixparams (RixParamList) - the param list to set the array on
+    setter (str) - name of the RixParamList method, ex: 'SetIntegerArray'
+    name (str) - name of the parameter
+    data (np.ndarray/list) - the array data
+    args - remaining arguments to pass to the setter (time sample, etc.)
+    '''
+    func = getattr(rixparams, setter)
+    length = len(data)
+    if isinstance(data, np.ndarray):
+        if __RMAN_BUFFER_SETTERS__.get(setter, True):
+            try:
+                func(name, np.ascontiguousarray(data), length, *args)
+                __RMAN_BUFFER_SETTERS__[setter] = True
+                return
+            except (TypeError, ValueError):
+                __RMAN_BUFFER_SETTERS__[setter] = False
+        data = data.tolist()
+    func(name, data, length, *args)
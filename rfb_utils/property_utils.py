@@ -48,6 +48,9 @@ __LOBES_ENABLE_PARAMS__ = [
     'enableGlow',
 ]
 
+# Export plans for each node class. See get_export_plan()
+__RMAN_EXPORT_PLANS__ = dict()
+
 class BlPropInfo:
 
     def __init__(self, node, prop_name, prop_meta):
@@ -126,6 +129,74 @@ class BlPropInfo:
 
         return True
     
+class BlPropExportInfo:
+    '''
+    The parts of BlPropInfo that only depend on a parameter's meta data, 
+    and that don't change from node to node. See get_export_plan()
+
+    Attributes:
+        prop_name (str) - the Blender property name
+        renderman_name (str) - the RenderMan parameter name
+        renderman_type (str) - the RenderMan parameter type
+        kind (str) - how the parameter gets exported: 'param', 'ui_struct', 'displaymetadata', 'array' or 'ramp'
+        linked_only (bool) - parameter is only exported if it is connected
+        gain_enable (str) - for PxrSurface gains, the name of the lobe enable parameter
+    '''
+
+    def __init__(self, node_type, prop_name, prop_meta):
+
+        from . import shadergraph_utils
+
+        self.prop_meta = prop_meta
+        self.prop_name = prop_name
+        self.renderman_name = prop_meta.get('renderman_name', prop_name)
+        self.param_name = self.renderman_name
+        self.vstructmember = prop_meta.get('vstructmember', None)
+        self.vstruct = prop_meta.get('vstruct', False)
+        self.widget = prop_meta.get('widget', 'default')
+        self.renderman_type = prop_meta.get('renderman_type', '')
+        self.param_type = self.renderman_type
+        self.arraySize = prop_meta.get('arraySize', None)
+        self.renderman_array_type = prop_meta.get('renderman_array_type', '')
+        self.type = prop_meta.get('type', '')
+        self.hide_input = prop_meta.get('hideInput', False)
+        self.options = prop_meta.get('options', list())
+        self.is_ui_struct = prop_meta.get('is_ui_struct', False)
+        self.ui_struct = prop_meta.get('ui_struct', None)
+        self.is_texture = shadergraph_utils.is_texture_property(prop_name, prop_meta)
+        self.linked_only = self.param_type in ['struct', 'enum']
+        self.gain_enable = None
+        if node_type == 'PxrSurfaceBxdfNode':
+            self.gain_enable = __GAINS_TO_ENABLE__.get(prop_name, None)
+
+        if self.is_ui_struct:
+            self.kind = 'ui_struct'
+        elif self.widget == 'displaymetadata':
+            self.kind = 'displaymetadata'
+        elif self.param_type == 'array':
+            self.kind = 'array'
+        elif self.param_type in ['colorramp', 'floatramp']:
+            self.kind = 'ramp'
+        else:
+            self.kind = 'param'
+
+    def is_exportable(self):
+        # same as BlPropInfo.is_exportable, minus the checks that
+        # depend on connections. ui_struct members are also skipped, 
+        # as they are exported with their ui_struct
+        if self.widget == 'null' and not self.vstructmember:
+            return False
+        if self.hide_input:
+            return False
+        if self.param_type == 'page':
+            return False
+        if self.prop_name == 'inputMaterial' or \
+            (self.vstruct is True) or (self.type == 'vstruct'):
+            return False
+        if self.ui_struct and not self.is_ui_struct:
+            return False
+        return True
+
 class BlPropVal:
     def __init__(self, **kwargs):
         self.name = kwargs.get('name', '')
@@ -946,70 +1017,179 @@ def set_ui_struct_rixparams(node, rman_sg_node, ui_struct_name, params, ob=None,
             set_rix_param(params, param_type, member, vals, is_reference=False, is_array=True, array_len=len(vals), node=node, force_write=True)
 
 
+def get_export_plan(node):
+    """Get the export plan for a node. The plan is the list of BlPropExportInfo
+    for the node's exportable parameters. It only depends on the node's prop_meta, so it
+    is built once for each node class, the first time a node of that class is exported.
+
+    Arguments:
+        node (AnyType) - the node or property group with prop_meta
+
+    Returns:
+        (list) - list of BlPropExportInfo
+    """
+
+    prop_meta = getattr(node, 'prop_meta', dict())
+    node_class = type(node)
+    plan_entry = __RMAN_EXPORT_PLANS__.get(node_class, None)
+    if plan_entry is None or plan_entry[0] is not prop_meta:
+        node_type = getattr(node, 'bl_idname', node_class.__name__)
+        plan = list()
+        for prop_name, meta in prop_meta.items():
+            export_info = BlPropExportInfo(node_type, prop_name, meta)
+            if export_info.is_exportable():
+                plan.append(export_info)
+        plan_entry = (prop_meta, plan)
+        __RMAN_EXPORT_PLANS__[node_class] = plan_entry
+    return plan_entry[1]
+
 def set_node_rixparams(node, rman_sg_node, params, ob=None, mat_name=None, group_node=None):
     # If node is OSL node get properties from dynamic location.
     if node.bl_label == "PxrOSL":
         set_pxrosl_params(node, rman_sg_node, params, ob=ob, mat_name=mat_name)
         return params
 
-    for prop_name, meta in node.prop_meta.items():
-        bl_prop_info = BlPropInfo(node, prop_name, meta)
-        param_widget = bl_prop_info.widget 
-        param_type = bl_prop_info.renderman_type 
-        param_name = bl_prop_info.renderman_name      
-        is_linked = bl_prop_info.is_linked
-        prop = bl_prop_info.prop
-
-        if not bl_prop_info.do_export:
+    inputs = getattr(node, 'inputs', dict())
+    for export_info in get_export_plan(node):
+        prop_name = export_info.prop_name
+        param_type = export_info.renderman_type 
+        param_name = export_info.renderman_name      
+        kind = export_info.kind
+
+        socket = inputs.get(prop_name, None)
+        is_linked = socket is not None and socket.is_linked
+        if export_info.linked_only and not is_linked:
             continue
 
-        if bl_prop_info.is_ui_struct:
+        if kind == 'ui_struct':
             array_len = getattr(node, '%s_arraylen' % prop_name)
             if array_len > 0:
                 set_ui_struct_rixparams(node, rman_sg_node, prop_name, params, ob=ob, mat_name=mat_name, group_node=group_node)
             continue
-        elif bl_prop_info.ui_struct:
-            # Skip if this is a ui_struct member. This should be taken care of above
-            # in set_ui_struct_rix_params
-            continue      
-        elif param_widget == 'displaymetadata':
+        elif kind == 'displaymetadata':
             set_dspymeta_params(node, prop_name, params)
             continue
         # array
-        elif param_type == 'array':
+        elif kind == 'array':
             # this is a regular array
-            set_array_rixparams(node, rman_sg_node, mat_name, bl_prop_info, prop_name, prop, params)
+            prop = getattr(node, prop_name, None)
+            set_array_rixparams(node, rman_sg_node, mat_name, export_info, prop_name, prop, params)
             continue
         # ramps
-        elif param_type in ['colorramp', 'floatramp']:
+        elif kind == 'ramp':
+            prop = getattr(node, prop_name, None)
             set_ramp_rixparams(node, prop_name, prop, param_type, params)        
             continue
        
-        if is_linked:
-            bl_prop_val = get_linked_val(bl_prop_info, rman_sg_node, mat_name=mat_name, group_node=group_node)
-            if bl_prop_val.value: 
+        if is_linked or export_info.vstructmember or param_type == 'string':
+            # these need the full BlPropInfo
+            bl_prop_info = BlPropInfo(node, prop_name, export_info.prop_meta)
+            if bl_prop_info.is_linked:
+                bl_prop_val = get_linked_val(bl_prop_info, rman_sg_node, mat_name=mat_name, group_node=group_node)
+                if bl_prop_val.value: 
+                    set_rix_param(params, param_type, param_name, bl_prop_val.value, is_reference=bl_prop_val.is_reference)
+                else:
+                    rfb_log().debug("Could not find connection for: %s.%s" % (node.name, param_name))                                 
+                continue
+
+            # see if vstruct linked
+            elif bl_prop_info.is_vstruct_and_linked:
+                bl_prop_val = get_vstruct_linked_val(node, rman_sg_node, bl_prop_info, mat_name=mat_name)
                 set_rix_param(params, param_type, param_name, bl_prop_val.value, is_reference=bl_prop_val.is_reference)
-            else:
-                rfb_log().debug("Could not find connection for: %s.%s" % (node.name, param_name))                                 
+                continue
 
-        # see if vstruct linked
-        elif bl_prop_info.is_vstruct_and_linked:
-            bl_prop_val = get_vstruct_linked_val(node, rman_sg_node, bl_prop_info, mat_name=mat_name)
-            set_rix_param(params, param_type, param_name, bl_prop_val.value, is_reference=bl_prop_val.is_reference)
+            val = get_prop_value(node, ob, rman_sg_node, bl_prop_info).value
 
-        # else export just the property's value
+        # if this is a gain on PxrSurface and the lobe isn't
+        # enabled     
+        elif export_info.gain_enable and not getattr(node, export_info.gain_enable):
+            val = [0, 0, 0] if param_type == 'color' else 0
         else:
-            bl_prop_val = get_prop_value(node, ob, rman_sg_node, bl_prop_info)
-            is_array = False 
-            array_len = -1
-            if bl_prop_info.arraySize:
-                is_array = True
-                array_len = int(bl_prop_info.arraySize)
-
-            set_rix_param(params, param_type, param_name, bl_prop_val.value, is_reference=False, is_array=is_array, array_len=array_len, node=node)
+            val = string_utils.convert_val(getattr(node, prop_name, None), type_hint=param_type)
+
+        # else export just the property's value
+        is_array = False 
+        array_len = -1
+        if export_info.arraySize:
+            is_array = True
+            array_len = int(export_info.arraySize)
+
+        set_rix_param(params, param_type, param_name, val, is_reference=False, is_array=is_array, array_len=array_len, node=node)
             
     return params      
 
+def get_node_signature(node, rman_sg_node, mat_name=None, group_node=None):
+    """Build a signature of everything set_node_rixparams reads from a node: the
+    node's property values, and the connections to its inputs. If the signature
+    hasn't changed, neither have the node's params.
+
+    Arguments:
+        node (bpy.types.Node) - the shading node
+        rman_sg_node (RmanSgNode) - the RmanSgNode the node is being exported for
+        mat_name (str) - the material name
+        group_node (bpy.types.Node) - the group node, if node is inside of a node group
+
+    Returns:
+        (tuple) - the signature, or None if the params depend on something outside of 
+                  the node (textures, string tokens, ramps, arrays, vstructs, OSL), and the
+                  node should always be exported.
+    """
+
+    from . import shadergraph_utils
+
+    if node.bl_label == "PxrOSL":
+        return None
+
+    signature = [node.bl_idname, prefs_utils.get_pref('rman_emit_default_params', False)]
+    prop_meta = getattr(node, 'prop_meta', dict())
+    inputs = getattr(node, 'inputs', dict())
+    for prop_name, meta in prop_meta.items():
+        param_type = meta.get('renderman_type', '')
+        if param_type == 'page':
+            continue
+        if param_type in ['array', 'colorramp', 'floatramp']:
+            return None
+        widget = meta.get('widget', 'default')
+        if widget in ['displaymetadata', 'assetidoutput']:
+            return None
+        vstructmember = meta.get('vstructmember', None)
+        if vstructmember:
+            # vstruct conditionals depend on the values of the upstream node
+            vstruct_name = vstructmember.split('.')[0]
+            if vstruct_name in inputs and inputs[vstruct_name].is_linked:
+                return None
+        if meta.get('is_ui_struct', False):
+            signature.append(getattr(node, '%s_arraylen' % prop_name, 0))
+            continue
+
+        val = getattr(node, prop_name, None)
+        if isinstance(val, (bpy.types.bpy_struct, bpy.types.bpy_prop_collection)):
+            return None
+        elif isinstance(val, str):
+            if '<' in val or '$' in val or shadergraph_utils.is_texture_property(prop_name, meta):
+                return None
+        elif hasattr(val, '__len__'):
+            val = tuple(val)
+        signature.append(val)
+
+    for socket in inputs:
+        if not socket.is_linked or len(socket.links) < 1:
+            continue
+        link = socket.links[0]
+        if link.from_node.bl_idname == 'NodeGroupInput':
+            # value can come from the group node
+            return None
+        param_type = prop_meta.get(socket.name, dict()).get('renderman_type', '')
+        val = get_output_param_str(rman_sg_node, link.from_node, mat_name, link.from_socket, socket, param_type)
+        signature.append((socket.identifier, val))
+
+    signature = tuple(signature)
+    try:
+        hash(signature)
+    except TypeError:
+        return None
+    return signature
+
 def property_group_to_rixparams(node, rman_sg_node, sg_node, ob=None, mat_name=None, group_node=None):
 
     params = sg_node.params
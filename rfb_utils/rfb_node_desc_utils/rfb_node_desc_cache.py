@@ -0,0 +1,118 @@
+"""On-disk cache of parsed node descriptions.
+
+Parsing every args and oso file is a large part of the time it takes to
+register the add-on. Parsed RfbNodeDesc objects are pickled, and keyed by the
+path, mtime and size of the file they came from, so a file only gets parsed
+again if it changed.
+"""
+
+# pylint: disable=import-error
+# pylint: disable=relative-import
+
+import os
+import sys
+import pickle
+import bpy
+from .rfb_node_desc import RfbNodeDesc
+from ...rfb_logger import rfb_log
+from ...rman_constants import RFB_ADDON_VERSION_STRING
+
+# bump this if RfbNodeDesc changes in a way that makes
+# previously pickled objects unusable
+__RFB_NODE_DESC_CACHE_VERSION__ = 1
+__RFB_NODE_DESC_CACHE_FILE__ = 'rfb_node_desc_cache.pickle'
+
+
+class RfbNodeDescCache(object):
+    """Cache of parsed RfbNodeDesc objects.
+
+    The cached descriptions are the ones straight from the parser, before any
+    overrides from the config files are applied, so changes to the
+    overrides don't require the cache to be rebuilt.
+
+    Attributes:
+        filepath (str) - the file the cache is saved to
+        header (tuple) - identifies the versions the cache was built with
+        entries (dict) - file path -> (mtime, size, pickled RfbNodeDesc)
+        used (dict) - the entries that were asked for during this session
+        dirty (bool) - whether anything was parsed, and the cache needs to be saved
+    """
+
+    def __init__(self, rmantree=''):
+        self.filepath = os.path.join(bpy.utils.user_resource('CONFIG'), __RFB_NODE_DESC_CACHE_FILE__)
+        self.header = (__RFB_NODE_DESC_CACHE_VERSION__, RFB_ADDON_VERSION_STRING,
+                       rmantree, tuple(sys.version_info[:2]))
+        self.entries = dict()
+        self.used = dict()
+        self.dirty = False
+
+    def load(self):
+        """Read the cache file. If the file is missing, corrupt, or was written by
+        a different version, the cache is left empty.
+        """
+        if not os.path.exists(self.filepath):
+            return
+        try:
+            with open(self.filepath, 'rb') as f:
+                header, entries = pickle.load(f)
+        except Exception as err:
+            rfb_log().debug("Could not read node description cache %s: %s" % (self.filepath, str(err)))
+            return
+        if header != self.header:
+            rfb_log().debug("Node description cache is out of date. Ignoring.")
+            return
+        self.entries = entries
+
+    def save(self):
+        """Write the cache file, if anything changed. Only the entries that were used
+        during this session are saved, so files that were deleted drop out of the cache.
+        """
+        if not self.dirty and len(self.used) == len(self.entries):
+            return
+        try:
+            os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+            # write to a temporary file first, in case other Blender sessions are
+            # starting at the same time
+            tmp_filepath = '%s.%d' % (self.filepath, os.getpid())
+            with open(tmp_filepath, 'wb') as f:
+                pickle.dump((self.header, self.used), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_filepath, self.filepath)
+        except Exception as err:
+            rfb_log().debug("Could not write node description cache %s: %s" % (self.filepath, str(err)))
+        self.entries = self.used
+        self.used = dict()
+        self.dirty = False
+
+    def get_node_desc(self, filepath):
+        """Get the RfbNodeDesc for an args or oso file, parsing the file only if
+        it's not in the cache or has changed.
+
+        Arguments:
+            filepath (FilePath) - path to the args or oso file
+
+        Returns:
+            (RfbNodeDesc) - a new copy of the node description
+        """
+        key = str(filepath)
+        try:
+            stat = os.stat(key)
+            mtime, size = stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return RfbNodeDesc(filepath)
+
+        entry = self.entries.get(key, None)
+        if entry and entry[0] == mtime and entry[1] == size:
+            try:
+                node_desc = pickle.loads(entry[2])
+                self.used[key] = entry
+                return node_desc
+            except Exception as err:
+                rfb_log().debug("Could not unpickle node description for %s: %s" % (key, str(err)))
+
+        node_desc = RfbNodeDesc(filepath)
+        try:
+            self.used[key] = (mtime, size, pickle.dumps(node_desc, protocol=pickle.HIGHEST_PROTOCOL))
+            self.dirty = True
+        except Exception as err:
+            rfb_log().debug("Could not pickle node description for %s: %s" % (key, str(err)))
+        return node_desc
@@ -2,6 +2,7 @@ from . import shadergraph_utils
 from . import object_utils
 from . import prefs_utils
 from . import string_utils
+from . import primvar_utils
 from ..rman_constants import RMAN_GLOBAL_VOL_AGGREGATE
 from ..rfb_logger import rfb_log
 import bpy
@@ -45,7 +46,7 @@ class BlAttribute:
         self.values = []
 
     @staticmethod
-    def parse_attributes(attrs_dict, ob, detail_map, detail_default='vertex'):
+    def parse_attributes(attrs_dict, ob, detail_map, detail_default='vertex', as_arrays=False):
         '''
         Helper function to parse an array of Blender's bpy.types.Attribute
 
@@ -55,6 +56,7 @@ class BlAttribute:
             detail_map (dict): a dictionary of ints to RenderMan detail strings 
             detail_default (str): default detail if we cannot determine what the detail should
                                   be from detail_map
+            as_arrays (bool): keep the values as numpy arrays, instead of converting them to lists
         '''
         import numpy as np
 
@@ -71,7 +73,7 @@ class BlAttribute:
                 values = np.zeros(npoints*2, dtype=np.float32)
                 attr.data.foreach_get('vector', values)
                 values = np.reshape(values, (npoints, 2))
-                rman_attr.values = values.tolist()
+                rman_attr.values = values if as_arrays else values.tolist()
 
             elif attr.data_type == 'FLOAT_VECTOR':
                 rman_attr = BlAttribute()
@@ -82,7 +84,7 @@ class BlAttribute:
                 values = np.zeros(npoints*3, dtype=np.float32)
                 attr.data.foreach_get('vector', values)
                 values = np.reshape(values, (npoints, 3))
-                rman_attr.values = values.tolist()
+                rman_attr.values = values if as_arrays else values.tolist()
             
             elif attr.data_type in ['BYTE_COLOR', 'FLOAT_COLOR']:
                 rman_attr = BlAttribute()
@@ -95,7 +97,10 @@ class BlAttribute:
                 values = np.zeros(npoints*4, dtype=np.float32)
                 attr.data.foreach_get('color', values)
                 values = np.reshape(values, (npoints, 4))
-                rman_attr.values .extend(values[0:, 0:3].tolist())
+                if as_arrays:
+                    rman_attr.values = np.ascontiguousarray(values[0:, 0:3])
+                else:
+                    rman_attr.values .extend(values[0:, 0:3].tolist())
 
             elif attr.data_type == 'FLOAT':
                 rman_attr = BlAttribute()
@@ -106,7 +111,7 @@ class BlAttribute:
                 npoints = len(attr.data)
                 values = np.zeros(npoints, dtype=np.float32)
                 attr.data.foreach_get('value', values)
-                rman_attr.values = values.tolist()                          
+                rman_attr.values = values if as_arrays else values.tolist()
             elif attr.data_type in ['INT8', 'INT']:
                 rman_attr = BlAttribute()
                 rman_attr.rman_name = attr.name
@@ -116,7 +121,7 @@ class BlAttribute:
                 npoints = len(attr.data)
                 values = np.zeros(npoints, dtype=np.int32)
                 attr.data.foreach_get('value', values)
-                rman_attr.values = values.tolist()                
+                rman_attr.values = values if as_arrays else values.tolist()
             
             if rman_attr:
                 rman_attr.rman_name = string_utils.sanitize_node_name(rman_attr.rman_name)
@@ -138,15 +143,15 @@ class BlAttribute:
             if rman_attr.rman_detail is None:
                 continue
             if rman_attr.rman_type == "float":
-                primvar.SetFloatDetail(rman_attr.rman_name, rman_attr.values, rman_attr.rman_detail)
+                primvar_utils.set_primvar_detail(primvar, 'SetFloatDetail', rman_attr.rman_name, rman_attr.values, rman_attr.rman_detail)
             elif rman_attr.rman_type == "float2":
-                primvar.SetFloatArrayDetail(rman_attr.rman_name, rman_attr.values, 2, rman_attr.rman_detail)
+                primvar_utils.set_primvar_detail(primvar, 'SetFloatArrayDetail', rman_attr.rman_name, rman_attr.values, 2, rman_attr.rman_detail)
             elif rman_attr.rman_type == "vector":
-                primvar.SetVectorDetail(rman_attr.rman_name, rman_attr.values, rman_attr.rman_detail)
+                primvar_utils.set_primvar_detail(primvar, 'SetVectorDetail', rman_attr.rman_name, rman_attr.values, rman_attr.rman_detail)
             elif rman_attr.rman_type == 'color':
-                primvar.SetColorDetail(rman_attr.rman_name, rman_attr.values, rman_attr.rman_detail)
+                primvar_utils.set_primvar_detail(primvar, 'SetColorDetail', rman_attr.rman_name, rman_attr.values, rman_attr.rman_detail)
             elif rman_attr.rman_type == 'integer':
-                primvar.SetIntegerDetail(rman_attr.rman_name, rman_attr.values, rman_attr.rman_detail)
+                primvar_utils.set_primvar_detail(primvar, 'SetIntegerDetail', rman_attr.rman_name, rman_attr.values, rman_attr.rman_detail)
 
 # ------------- Filtering -------------
 def is_visible_layer(scene, ob):
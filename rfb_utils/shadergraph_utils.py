@@ -15,10 +15,11 @@ import math
 import bpy
 
 class BlNodeInfo:
-    def __init__(self, sg_node, group_node=None, is_cycles_node=False):
+    def __init__(self, sg_node, group_node=None, is_cycles_node=False, is_cached=False):
         self.sg_node = sg_node
         self.group_node = group_node
         self.is_cycles_node = is_cycles_node
+        self.is_cached = is_cached # sg_node was reused from a previous export, and its params are up to date
 
 
 class RmanConvertNode:
@@ -1,4 +1,5 @@
 from ..rfb_utils.rfb_node_desc_utils.rfb_node_desc import RfbNodeDesc
+from ..rfb_utils.rfb_node_desc_utils.rfb_node_desc_cache import RfbNodeDescCache
 from ..rfb_utils import filepath_utils
 from ..rfb_utils.filepath import FilePath
 from ..rfb_utils import generate_property_utils
@@ -19,6 +20,7 @@ from ..rman_constants import RFB_ARRAYS_MAX_LEN
 from ..rman_constants import CYCLES_NODE_MAP
 from ..rman_constants import RMAN_FAKE_NODEGROUP
 from ..rman_constants import BLENDER_41
+from ..rman_constants import RFB_SCENE_VERSION_STRING
 from nodeitems_utils import NodeCategory, NodeItem
 from collections import OrderedDict
 from copy import deepcopy
@@ -89,9 +91,39 @@ __RMAN_PLUGIN_MAPPING__ = {
 }
 
 
+class RmanBlNodesMap(dict):
+    '''
+    Map of RenderMan node names to Blender node type names. With lazy registration 
+    (see use_lazy_registration), looking up a name registers the node type, if it hasn't 
+    been registered already. Use typename() to look up a name without registering it.
+    '''
+
+    def __getitem__(self, key):
+        typename = super().__getitem__(key)
+        ensure_node_type(typename)
+        return typename
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        return self[key]
+
+    def typename(self, key, default=None):
+        return super().get(key, default)
+
 # map RenderMan name to Blender node name
 # ex: PxrStylizedControl -> PxrStylizedControlPatternNode
-__BL_NODES_MAP__ = dict()
+__BL_NODES_MAP__ = RmanBlNodesMap()
+
+# node types that can be registered lazily. There are a lot
+# of these, and most scenes only use a few of them.
+__RMAN_LAZY_NODE_CATEGORIES__ = ['pattern', 'bxdf', 'displace']
+
+# Blender node type names of all of the lazy node types
+__RMAN_LAZY_NODE_TYPENAMES__ = set()
+
+# node types that are waiting to be registered: typename -> (node_desc, is_oso)
+__RMAN_LAZY_NODE_DESCS__ = dict()
 
 __CYCLES_NODE_DESC_MAP__ = dict()
 __RMAN_NODES_ALREADY_REGISTERED__ = False
@@ -113,6 +145,106 @@ def get_cycles_node_desc(node):
 
     return (mapping, node_desc)
 
+def use_lazy_registration():
+    '''
+    Whether pattern, bxdf and displacement node types should only be registered when
+    they are first needed, rather than at startup. This is turned on with the
+    RFB_LAZY_NODE_REGISTRATION environment variable, and is meant for batch renders.
+
+    Returns:
+    (bool) - True if lazy registration should be used
+    '''
+    return envconfig().getenv('RFB_LAZY_NODE_REGISTRATION', '0') == '1'
+
+def ensure_node_type(typename):
+    '''
+    Make sure a node type is registered. Does nothing unless the node type
+    is still waiting to be registered, because of lazy registration.
+
+    Arguments:
+    typename (str) - the Blender node type name, ex: PxrSurfaceBxdfNode
+
+    Returns:
+    (bool) - True if the node type was registered by this call
+    '''
+    entry = __RMAN_LAZY_NODE_DESCS__.get(typename, None)
+    if entry is None:
+        return False
+
+    # OSL patterns are registered under two names. generate_node_type
+    # registers both, so remove both of them.
+    for nm in [k for k, v in __RMAN_LAZY_NODE_DESCS__.items() if v is entry]:
+        __RMAN_LAZY_NODE_DESCS__.pop(nm)
+
+    node_desc, is_oso = entry
+    rfb_log().debug("Registering node type on first use: %s" % typename)
+    typename, nodetype = generate_node_type(node_desc, is_oso=is_oso)
+    if typename and nodetype:
+        __RMAN_NODE_TYPES__[typename] = nodetype
+    return True
+
+def _get_all_node_trees():
+    node_trees = [ng for ng in bpy.data.node_groups]
+    for coll in [bpy.data.materials, bpy.data.worlds, bpy.data.lights]:
+        for id in coll:
+            if id.node_tree:
+                node_trees.append(id.node_tree)
+    return node_trees
+
+def get_used_node_types():
+    '''
+    Get the lazy node types (pattern, bxdf and displacement) used in
+    the current file.
+
+    Returns:
+    (list) - sorted list of Blender node type names
+    '''
+    typenames = set()
+    for nt in _get_all_node_trees():
+        for node in nt.nodes:
+            if node.bl_idname in __RMAN_LAZY_NODE_TYPENAMES__:
+                typenames.add(node.bl_idname)
+    return sorted(typenames)
+
+def register_used_node_types():
+    '''
+    Register the node types that the file that was just loaded needs. 
+    The list of node types is saved with the file (see get_used_node_types). 
+    If the file doesn't have the list, was saved with a different version (upgrading
+    the scene may add new nodes), or we still find nodes with an unknown type, 
+    we fall back to registering all of the remaining node types.
+    '''
+    if not __RMAN_LAZY_NODE_DESCS__:
+        return
+
+    register_all = False
+    typenames = set()
+    for scene in bpy.data.scenes:
+        rm = scene.renderman
+        if not rm.rman_node_types_saved or rm.renderman_version != RFB_SCENE_VERSION_STRING:
+            register_all = True
+            break
+        typenames.update([t for t in rm.rman_node_types.split(',') if t])
+
+    if not register_all:
+        for typename in typenames:
+            ensure_node_type(typename)
+
+        for nt in _get_all_node_trees():
+            for node in nt.nodes:
+                if node.bl_idname in __RMAN_LAZY_NODE_DESCS__:
+                    ensure_node_type(node.bl_idname)
+                elif node.bl_idname == 'NodeUndefined':
+                    register_all = True
+                    break
+            if register_all:
+                break
+
+    if register_all:
+        rfb_log().debug("Could not determine the node types used in this file. Registering all node types.")
+        for typename in list(__RMAN_LAZY_NODE_DESCS__.keys()):
+            ensure_node_type(typename)
+
 def class_generate_properties(node, parent_name, node_desc):
     prop_names = []
     prop_meta = {}
@@ -743,6 +875,11 @@ def register_rman_nodes():
 
     rfb_log().debug("Registering RenderMan Plugin Nodes:")
     path_list = envconfig().get_shader_registration_paths()
+    node_desc_cache = RfbNodeDescCache(rmantree=envconfig().rmantree)
+    node_desc_cache.load()
+    lazy_registration = use_lazy_registration()
+    if lazy_registration:
+        rfb_log().debug("Using lazy registration for pattern, bxdf and displacement nodes.")
     visited = set()
     for path in path_list:
         for root, dirnames, filenames in os.walk(path):
@@ -767,7 +904,7 @@ def register_rman_nodes():
                         is_args = False
 
                     rfb_log().debug("\t    Parsing: %s" % filename)
-                    node_desc = RfbNodeDesc(FilePath(root).join(FilePath(filename)))
+                    node_desc = node_desc_cache.get_node_desc(FilePath(root).join(FilePath(filename)))
 
                     # apply any overrides
                     rman_config.apply_args_overrides(filename, node_desc)
@@ -783,16 +920,33 @@ def register_rman_nodes():
                         register_plugin_types(node_desc)
                         continue
                     
-                    typename, nodetype = generate_node_type(node_desc, is_oso=is_oso)
-                    if not typename and not nodetype:
-                        continue
-
-                    if typename and nodetype:
-                        __RMAN_NODE_TYPES__[typename] = nodetype
+                    if node_desc.node_type in __RMAN_LAZY_NODE_CATEGORIES__:
+                        typename = '%s%sNode' % (node_desc.name, node_desc.node_type.capitalize())
+                        typenames = [typename]
+                        if node_desc.node_type == 'pattern' and is_oso:
+                            # see generate_node_type
+                            typenames.append('%s%sOSLNode' % (node_desc.name, node_desc.node_type.capitalize()))
+                        __RMAN_LAZY_NODE_TYPENAMES__.update(typenames)
+
+                    if lazy_registration and node_desc.node_type in __RMAN_LAZY_NODE_CATEGORIES__:
+                        # only add the menu entries for now. The node type
+                        # gets registered when it's needed
+                        entry = (node_desc, is_oso)
+                        for nm in typenames:
+                            __RMAN_LAZY_NODE_DESCS__[nm] = entry
                         __BL_NODES_MAP__[node_desc.name] = typename
+                        node_item = RendermanNodeItem(typename, label=node_desc.name)
+                    else:
+                        typename, nodetype = generate_node_type(node_desc, is_oso=is_oso)
+                        if not typename and not nodetype:
+                            continue
+
+                        if typename and nodetype:
+                            __RMAN_NODE_TYPES__[typename] = nodetype
+                            __BL_NODES_MAP__[node_desc.name] = typename
 
-                    # categories
-                    node_item = RendermanNodeItem(typename, label=nodetype.bl_label)
+                        # categories
+                        node_item = RendermanNodeItem(typename, label=nodetype.bl_label)
                     if node_desc.node_type == 'pattern': 
                         classification = getattr(node_desc, 'classification', '')                                                       
                         if classification and classification != '':
@@ -872,6 +1026,7 @@ def register_rman_nodes():
                         __RMAN_NODE_CATEGORIES__['projection']['projection'][0][1].append(node_item)  
                         __RMAN_NODE_CATEGORIES__['projection']['projection'][1].append(node_desc)                             
 
+    node_desc_cache.save()
     rfb_log().debug("Finished Registering RenderMan Plugin Nodes.")
 
 
@@ -29,7 +29,9 @@ def set_qn_env_vars(bl_scene):
 def rman_load_post(bl_scene):
     from ..rman_ui import rman_ui_light_handlers
     from ..rfb_utils import scene_utils
+    from .. import rman_bl_nodes
     
+    rman_bl_nodes.register_used_node_types()
     string_utils.update_blender_tokens_cb(bl_scene)
     rman_ui_light_handlers.clear_gl_tex_cache(bl_scene)
     texture_utils.txmanager_load_cb(bl_scene)
@@ -39,7 +41,13 @@ def rman_load_post(bl_scene):
 
 @persistent
 def rman_save_pre(bl_scene):
+    from .. import rman_bl_nodes
+
     string_utils.update_blender_tokens_cb(bl_scene)
+    rman_node_types = ','.join(rman_bl_nodes.get_used_node_types())
+    for scene in bpy.data.scenes:
+        scene.renderman.rman_node_types = rman_node_types
+        scene.renderman.rman_node_types_saved = True
     shadergraph_utils.save_bl_ramps(bl_scene)
     upgrade_utils.update_version(bl_scene)
 
@@ -129,6 +129,39 @@ class PRMAN_OT_BatchRender(bpy.types.Operator):
     bl_description = "Launch a spooled batch render."
     bl_options = {'INTERNAL'}    
 
+    def stash_scene_file(self, context):
+        '''
+        Save a temporary copy of the scene file for background processes to load.
+        The blend token is set to the real file name. Callers should reset it 
+        when they are done.
+
+        Returns:
+        (str, str) - the temporary .blend file, and a copy of the blend cache 
+        directory (empty string if there's no blend cache)
+        '''
+        rm = context.scene.renderman
+        bl_scene_file = bpy.data.filepath
+        pid = os.getpid()
+        timestamp = int(time.time())
+        _id = 'pid%s_%d' % (str(pid), timestamp)
+        bl_filepath = os.path.dirname(bl_scene_file)
+        bl_filename = os.path.splitext(os.path.basename(bl_scene_file))[0]
+        bl_cache_dir = os.path.join(bl_filepath, 'blendcache_%s' % bl_filename)
+
+        # set blend_token to the real filename
+        rm.blend_token = bl_filename
+        bl_stash_name = '_%s%s_' % (bl_filename, _id)
+        bl_stash_scene_file = os.path.join(bl_filepath, '%s.blend' % (bl_stash_name))
+
+        # copy the blend cache to the stash scene name
+        bl_stash_blend_cache = ""
+        if os.path.exists(bl_cache_dir):
+            bl_stash_blend_cache = os.path.join(bl_filepath, 'blendcache_%s' % bl_stash_name)
+            shutil.copytree(bl_cache_dir, bl_stash_blend_cache)
+
+        bpy.ops.wm.save_as_mainfile(filepath=bl_stash_scene_file, copy=True)
+        return (bl_stash_scene_file, bl_stash_blend_cache)
+
     def blender_batch_render(self, context):
         rm = context.scene.renderman
         if rm.queuing_system != 'none':
@@ -146,32 +179,11 @@ class PRMAN_OT_BatchRender(bpy.types.Operator):
             rr.rman_scene.external_render = True
             spooler = rman_spool.RmanSpool(rr, rr.rman_scene, depsgraph)
 
-            bl_scene_file = bpy.data.filepath
-            pid = os.getpid()
-            timestamp = int(time.time())
-            _id = 'pid%s_%d' % (str(pid), timestamp)
-            bl_filepath = os.path.dirname(bl_scene_file)
-            bl_filename = os.path.splitext(os.path.basename(bl_scene_file))[0]
-            bl_cache_dir = os.path.join(bl_filepath, 'blendcache_%s' % bl_filename)
-
             # cache out any dynamics
             bpy.ops.ptcache.bake_all(bake=True)
-            
-            # create a temporary .blend file
-               
-
-            # set blend_token to the real filename
-            rm.blend_token = bl_filename
-            bl_stash_name = '_%s%s_' % (bl_filename, _id)
-            bl_stash_scene_file = os.path.join(bl_filepath, '%s.blend' % (bl_stash_name))
 
-            # copy the blend cache to the stash scene name
-            bl_stash_blend_cache = ""
-            if os.path.exists(bl_cache_dir):
-                bl_stash_blend_cache = os.path.join(bl_filepath, 'blendcache_%s' % bl_stash_name)
-                shutil.copytree(bl_cache_dir, bl_stash_blend_cache)
-
-            bpy.ops.wm.save_as_mainfile(filepath=bl_stash_scene_file, copy=True)
+            # create a temporary .blend file
+            bl_stash_scene_file, bl_stash_blend_cache = self.stash_scene_file(context)
             spooler.blender_batch_render(bl_stash_scene_file, bl_stash_blend_cache=bl_stash_blend_cache)
             # now reset the token back
             rm.blend_token = ''
@@ -185,6 +197,12 @@ class PRMAN_OT_BatchRender(bpy.types.Operator):
             # cache out any dynamics
             bpy.ops.ptcache.bake_all(bake=True)
             
+            if rm.external_animation and rm.rib_export_processes != 1:
+                if bpy.data.filepath:
+                    self.rib_batch_render_workers(context)
+                    return
+                rfb_log().warning("Scene file has not been saved. Writing RIB in this Blender session.")
+
             scene.renderman.enable_external_rendering = True        
             try:
                 for view_layer in scene.view_layers:
@@ -196,6 +214,27 @@ class PRMAN_OT_BatchRender(bpy.types.Operator):
         else:
             self.report({"ERROR"}, "Viewport rendering is on.")           
 
+    def rib_batch_render_workers(self, context):
+        # write RIB for all frames using background processes
+        scene = context.scene
+        rm = scene.renderman
+        rr = RmanRender.get_rman_render()
+        bl_stash_scene_file, bl_stash_blend_cache = self.stash_scene_file(context)
+        try:
+            for view_layer in scene.view_layers:
+                if not view_layer.use:
+                    continue
+                if not rr.start_external_render_workers(view_layer.depsgraph, bl_stash_scene_file):
+                    self.report({'ERROR'}, 'RIB export failed for view layer: %s' % view_layer.name)
+                    break
+        finally:
+            # now reset the token back, and remove the temporary files
+            rm.blend_token = ''
+            if os.path.exists(bl_stash_scene_file):
+                os.remove(bl_stash_scene_file)
+            if bl_stash_blend_cache:
+                shutil.rmtree(bl_stash_blend_cache, ignore_errors=True)
+
     def execute(self, context):
         scene = context.scene
         rm = scene.renderman
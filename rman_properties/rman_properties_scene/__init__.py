@@ -162,6 +162,11 @@ class RendermanSceneSettings(RmanBasePropertyGroup, bpy.types.PropertyGroup):
 
     renderman_version: StringProperty(name="RenderMan Version", default='')
 
+    # RenderMan node types used in this file. Saved with the file, so we know which node
+    # types need to be registered on load, when using lazy registration
+    rman_node_types: StringProperty(name="RenderMan Node Types", default='', options={'HIDDEN'})
+    rman_node_types_saved: BoolProperty(name="RenderMan Node Types Saved", default=False, options={'HIDDEN'})
+
 classes = [         
     RendermanSceneSettings
 ]           
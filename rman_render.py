@@ -8,6 +8,7 @@ from .rman_constants import RFB_VIEWPORT_MAX_BUCKETS, RMAN_RENDERMAN_BLUE, USE_G
 from .rman_scene import RmanScene
 from .rman_scene_sync import RmanSceneSync
 from. import rman_spool
+from. import rman_rib_export
 from. import chatserver
 from .rfb_logger import rfb_log
 import socketserver
@@ -482,6 +483,10 @@ class RmanRender(object):
         self.viewport_res_y = -1
         self.viewport_buckets = list()
         self._draw_viewport_buckets = False
+        self._pixel_buffers = dict() # preallocated back-fill buffers, keyed by (width, height, channels)
+        self._framebuffers = dict() # last pixels read from the display driver, keyed by image number
+        self._viewport_texture = None # last texture drawn to the viewport
+        self._viewport_texture_key = None # (width, height, format) of _viewport_texture
         self.stats_mgr = RfBStatsManager(self)
         self.deleting_bl_engine = threading.Lock()
         self.stop_render_mtx = threading.Lock()
@@ -833,75 +838,52 @@ class RmanRender(object):
 
         if rm.external_animation:
             original_frame = bl_scene.frame_current
-            do_persistent_data = rm.do_persistent_data
+            # keep one scene around for all frames, and only 
+            # update what changed from frame to frame
+            export_deltas = rm.do_persistent_data or rm.rib_export_deltas
             rfb_log().debug("Writing to RIB...")     
             time_start = time.time()
 
-            if do_persistent_data:
-                        
-                for frame in range(bl_scene.frame_start, bl_scene.frame_end + 1, bl_scene.frame_step):
-                    bl_view_layer = depsgraph.view_layer_eval
-                    config = rman.Types.RtParamList()
-                    render_config = rman.Types.RtParamList()
-
-                    if self.sg_scene is None:                        
-                        self.create_scene(config, render_config)
-                    try:
-                        self.bl_engine.frame_set(frame, subframe=0.0)
-                        rfb_log().debug("Frame: %d" % frame)
-                        if frame == bl_scene.frame_start:
-                            self.rman_is_exporting = True
-                            self.rman_scene.export_for_final_render(depsgraph, self.sg_scene, bl_view_layer, is_external=True)
-                            self.rman_is_exporting = False
-                        else:
-                            self.rman_scene_sync.batch_update_scene(bpy.context, depsgraph)
-                            
-                        rib_output = string_utils.expand_string(rm.path_rib_output, 
-                                                                asFilePath=True)
-                        self.sg_scene.Render("rib %s %s" % (rib_output, rib_options))                
-
-                    except Exception as e:      
-                        self.bl_engine.report({'ERROR'}, 'Export failed: %s' % str(e))
-                        rfb_log().error('Export Failed:\n%s' % traceback.format_exc())
-                        self.stop_render(stop_draw_thread=False)
-                        self.del_bl_engine()
-                        return False         
-
-                self.sgmngr.DeleteScene(self.sg_scene) 
-                self.sg_scene = None   
-                self.rman_scene.reset()       
-            else:     
-                for frame in range(bl_scene.frame_start, bl_scene.frame_end + 1):
-                    bl_view_layer = depsgraph.view_layer_eval
-                    config = rman.Types.RtParamList()
-                    render_config = rman.Types.RtParamList()
+            for frame in range(bl_scene.frame_start, bl_scene.frame_end + 1, bl_scene.frame_step):
+                bl_view_layer = depsgraph.view_layer_eval
+                config = rman.Types.RtParamList()
+                render_config = rman.Types.RtParamList()
 
+                do_full_export = (self.sg_scene is None)
+                if do_full_export:
                     self.create_scene(config, render_config)
-                    try:
-                        self.bl_engine.frame_set(frame, subframe=0.0)
-                        rfb_log().debug("Frame: %d" % frame)
+                try:
+                    self.bl_engine.frame_set(frame, subframe=0.0)
+                    rfb_log().debug("Frame: %d" % frame)
+                    frame_time_start = time.time()
+                    if do_full_export:
                         self.rman_is_exporting = True
                         self.rman_scene.export_for_final_render(depsgraph, self.sg_scene, bl_view_layer, is_external=True)
                         self.rman_is_exporting = False
-                            
-                        rib_output = string_utils.expand_string(rm.path_rib_output, 
-                                                                asFilePath=True)
-                        self.sg_scene.Render("rib %s %s" % (rib_output, rib_options))
+                    else:
+                        self.rman_scene_sync.batch_update_scene(bpy.context, depsgraph)
+                        
+                    rib_output = string_utils.expand_string(rm.path_rib_output, 
+                                                            asFilePath=True)
+                    self.sg_scene.Render("rib %s %s" % (rib_output, rib_options))
+                    rfb_log().debug("Finished writing RIB for frame %d. Time: %s" % (frame, string_utils._format_time_(time.time() - frame_time_start)))
+
+                    if not export_deltas:
                         self.sgmngr.DeleteScene(self.sg_scene) 
                         self.sg_scene = None   
                         self.rman_scene.reset()                     
 
-                    except Exception as e:      
-                        self.bl_engine.report({'ERROR'}, 'Export failed: %s' % str(e))
-                        rfb_log().error('Export Failed:\n%s' % traceback.format_exc())
-                        self.stop_render(stop_draw_thread=False)
-                        self.del_bl_engine()
-                        return False         
-
-                if self.sg_scene:
-                    self.sgmngr.DeleteScene(self.sg_scene) 
-                    self.sg_scene = None   
-                    self.rman_scene.reset()                                            
+                except Exception as e:      
+                    self.bl_engine.report({'ERROR'}, 'Export failed: %s' % str(e))
+                    rfb_log().error('Export Failed:\n%s' % traceback.format_exc())
+                    self.stop_render(stop_draw_thread=False)
+                    self.del_bl_engine()
+                    return False         
+
+            if self.sg_scene:
+                self.sgmngr.DeleteScene(self.sg_scene) 
+                self.sg_scene = None   
+                self.rman_scene.reset()                                            
             rfb_log().info("Finished parsing scene. Total time: %s" % string_utils._format_time_(time.time() - time_start))
             self.bl_engine.frame_set(original_frame, subframe=0.0)
             
@@ -949,6 +931,41 @@ class RmanRender(object):
         self._do_prman_render_end()
         return True          
 
+    def start_external_render_workers(self, depsgraph, bl_filename):
+        '''
+        Export RIB for all frames using background Blender processes, 
+        then spool the render. See RmanRibExportWorkers.
+
+        Arguments:
+        depsgraph (bpy.types.Depsgraph) - the depsgraph of the view layer to export
+        bl_filename (str) - the .blend file the background processes should load
+
+        Returns:
+        (bool) - True if the export was successful
+        '''
+        bl_scene = depsgraph.scene_eval
+        rm = bl_scene.renderman
+
+        self.rman_running = True
+        try:
+            self.rman_is_exporting = True
+            workers = rman_rib_export.RmanRibExportWorkers(self, bl_scene, depsgraph.view_layer.name, bl_filename)
+            ok = workers.run()
+            self.rman_is_exporting = False
+
+            if ok and rm.queuing_system != 'none':
+                self.rman_scene.bl_scene = bl_scene
+                self.rman_scene.bl_view_layer = depsgraph.view_layer
+                self.rman_scene.bl_frame_current = bl_scene.frame_current
+                self.rman_scene._find_renderman_layer()
+                self.rman_scene.external_render = True
+                spooler = rman_spool.RmanSpool(self, self.rman_scene, depsgraph)
+                spooler.batch_render()
+        finally:
+            self.rman_is_exporting = False
+            self.rman_running = False
+        return ok
+
     def start_bake_render(self, depsgraph, for_background=False):
         self.reset()
         if self._do_prman_render_begin():
@@ -1134,6 +1151,9 @@ class RmanRender(object):
                 self.rman_callbacks["Render"] = live_render_cb                    
                 self.viewport_buckets.clear()
                 self._draw_viewport_buckets = True
+                self._framebuffers.clear()
+                self._viewport_texture = None
+                self._viewport_texture_key = None
             else:
                 rman.Dspy.EnableDspyServer()
                 add_ipr_to_it_handlers()
@@ -1451,13 +1471,9 @@ class RmanRender(object):
             res_mult = self.rman_scene.viewport_render_res_mult
             width = int(self.viewport_res_x * res_mult)
             height = int(self.viewport_res_y * res_mult)
-            buffer = self._get_buffer(width, height)
-            if buffer is None:
-                rfb_log().debug("Buffer is None")
+            texture = self._get_viewport_texture(width, height)
+            if texture is None:
                 return
-            pixels = gpu.types.Buffer('FLOAT', width * height * 4, buffer)
-
-            texture = gpu.types.GPUTexture((width, height), format='RGBA32F', data=pixels)
             draw_texture_2d(texture, (0, 0), self.viewport_res_x, self.viewport_res_y)
         else:
             # (the driver will handle pixel scaling to the given viewport size)
@@ -1528,57 +1544,170 @@ class RmanRender(object):
             batch = batch_for_shader(shader, 'LINES', {"pos": vtx})
             batch.draw(shader)   
 
+    def _get_viewport_texture(self, width, height):
+        '''
+        Get the texture to draw in the viewport. The texture from the previous
+        redraw is reused if the resolution and texture format have not changed,
+        and the display driver has not received any new pixels since then.
+
+        Arguments:
+        width (int) - width of the image
+        height (int) - height of the image
+
+        Returns:
+        (gpu.types.GPUTexture) - the texture to draw, or None if we could not get
+        a buffer from the display driver
+        '''
+        tex_format = 'RGBA32F'
+        if get_pref('rman_viewport_half_float', default=False):
+            tex_format = 'RGBA16F'
+        key = (width, height, tex_format)
+
+        if self._viewport_texture is not None and self._viewport_texture_key == key:
+            if self.xpu_slow_mode:
+                # the draw thread is responsible for checking and resetting 
+                # the updated flag. We're only here because it told us there
+                # were new pixels.
+                pass
+            elif not self.has_buffer_updated():
+                return self._viewport_texture
+            else:
+                # reset the flag before reading the buffer, so that
+                # any pixels that arrive while we're copying are picked
+                # up on the next redraw
+                self.reset_buffer_updated()
+
+        buffer = self._get_buffer(width, height)
+        if buffer is None:
+            rfb_log().debug("Buffer is None")
+            return None
+        pixels = gpu.types.Buffer('FLOAT', width * height * 4, buffer)
+        self._viewport_texture = gpu.types.GPUTexture((width, height), format=tex_format, data=pixels)
+        self._viewport_texture_key = key
+        return self._viewport_texture
+
     def get_numchannels(self, image_num):
         dspy_plugin = self.get_blender_dspy_plugin()
         num_channels = dspy_plugin.GetNumberOfChannels(ctypes.c_size_t(image_num))
         return num_channels
 
-    def _get_buffer(self, width, height, image_num=0, num_channels=-1, raw_buffer=False, back_fill=True, as_flat=True, render=None):
+    def _get_pixel_buffer(self, width, height, num_channels):
+        '''
+        Return a preallocated RGBA buffer of shape (width*height, 4), used to
+        back-fill AOVs that have less than 4 channels. Buffers are reused between
+        calls with the same width, height and number of channels, so callers
+        need to copy the data if they want to hold onto it.
+
+        Arguments:
+        width (int) - width of the image
+        height (int) - height of the image
+        num_channels (int) - number of channels of the source AOV
+
+        Returns:
+        (numpy.ndarray) - float32 array of shape (width*height, 4)
+        '''
+        key = (width, height, num_channels)
+        pixels = self._pixel_buffers.get(key, None)
+        if pixels is None:
+            if len(self._pixel_buffers) > 8:
+                # viewport was probably resized multiple times
+                # don't hold onto stale buffers
+                self._pixel_buffers.clear()
+            # the alpha channel, and any channel we don't copy into,
+            # is always 1.0
+            pixels = numpy.ones((width*height, 4), dtype=numpy.float32)
+            self._pixel_buffers[key] = pixels
+        return pixels
+
+    def _back_fill(self, src, pixels, num_channels):
+        '''
+        Expand a 1, 2 or 3 channel buffer to RGBA. 1 channel AOVs are 
+        copied to R, G and B.
+
+        Arguments:
+        src (numpy.ndarray) - source pixels, of shape (n, num_channels)
+        pixels (numpy.ndarray) - destination RGBA pixels, of shape (n, 4)
+        num_channels (int) - number of channels in src
+        '''
+        if num_channels == 1:
+            pixels[:, 0:3] = src
+        else:
+            pixels[:, 0:num_channels] = src
+
+    def _read_framebuffer(self, image_num, array_size):
+        '''
+        Read the framebuffer for image_num from the display driver. The returned
+        array is kept between calls and only the region that the display driver
+        has written to since the last call is copied. If the display driver does
+        not support dirty regions, the whole framebuffer is copied into a new array.
+
+        Arguments:
+        image_num (int) - the index of the display
+        array_size (int) - width * height * number of channels
+
+        Returns:
+        (numpy.ndarray) - flat float32 array with the pixels. Callers should not
+        modify or hold onto this array.
+        '''
         dspy_plugin = self.get_blender_dspy_plugin()
-        if num_channels == -1:
-            num_channels = self.get_numchannels(image_num)
-            if num_channels > 4 or num_channels < 0:
-                rfb_log().debug("Could not get buffer. Incorrect number of channels: %d" % num_channels)
-                return None
 
         # code reference: https://asiffer.github.io/posts/numpy/
         RMAN_NUMPY_POINTER = numpy.ctypeslib.ndpointer(dtype=numpy.float32, 
                                       ndim=1,
                                       flags="C")
-        f = dspy_plugin.GetFloatFramebuffer
-        f.argtypes = [ctypes.c_size_t, ctypes.c_size_t, RMAN_NUMPY_POINTER]
 
-        try:
-            array_size = width * height * num_channels
+        if not hasattr(dspy_plugin, 'GetDirtyFloatFramebuffer'):
+            # older display driver
+            f = dspy_plugin.GetFloatFramebuffer
+            f.argtypes = [ctypes.c_size_t, ctypes.c_size_t, RMAN_NUMPY_POINTER]
             buffer = numpy.zeros(array_size, dtype=numpy.float32)
             f(ctypes.c_size_t(image_num), buffer.size, buffer)
+            return buffer
+
+        buffer = self._framebuffers.get(image_num, None)
+        if buffer is None or buffer.size != array_size:
+            buffer = numpy.zeros(array_size, dtype=numpy.float32)
+            self._framebuffers[image_num] = buffer
+            # make sure the whole framebuffer gets copied into our new array
+            dspy_plugin.SetFramebufferDirty(ctypes.c_size_t(image_num))
+
+        f = dspy_plugin.GetDirtyFloatFramebuffer
+        f.argtypes = [ctypes.c_size_t, ctypes.c_size_t, RMAN_NUMPY_POINTER]
+        f.restype = ctypes.c_bool
+        f(ctypes.c_size_t(image_num), buffer.size, buffer)
+        return buffer
+
+    def _get_buffer(self, width, height, image_num=0, num_channels=-1, raw_buffer=False, back_fill=True, as_flat=True, render=None):
+        dspy_plugin = self.get_blender_dspy_plugin()
+        if num_channels == -1:
+            num_channels = self.get_numchannels(image_num)
+            if num_channels > 4 or num_channels < 0:
+                rfb_log().debug("Could not get buffer. Incorrect number of channels: %d" % num_channels)
+                return None
 
+        try:
+            array_size = width * height * num_channels
             if raw_buffer:
+                # code reference: https://asiffer.github.io/posts/numpy/
+                RMAN_NUMPY_POINTER = numpy.ctypeslib.ndpointer(dtype=numpy.float32, 
+                                            ndim=1,
+                                            flags="C")
+                f = dspy_plugin.GetFloatFramebuffer
+                f.argtypes = [ctypes.c_size_t, ctypes.c_size_t, RMAN_NUMPY_POINTER]
+                buffer = numpy.zeros(array_size, dtype=numpy.float32)
+                f(ctypes.c_size_t(image_num), buffer.size, buffer)
                 if not as_flat:
                     buffer.shape = (height, width, num_channels)
                 return buffer
 
+            buffer = self._read_framebuffer(image_num, array_size)
+
             if as_flat:
                 if (num_channels == 4) or not back_fill:
                     return buffer
-                else:
-                    p_pos = 0
-                    pixels = numpy.ones(width*height*4, dtype=numpy.float32)
-                    for y in range(0, height):
-                        i = (width * y * num_channels)
-                        
-                        for x in range(0, width):
-                            j = i + (num_channels * x)
-                            if num_channels == 3:
-                                pixels[p_pos:p_pos+3] = buffer[j:j+3]
-                            elif num_channels == 2:
-                                pixels[p_pos:p_pos+2] = buffer[j:j+2]
-                            elif num_channels == 1:
-                                pixels[p_pos] = buffer[j]
-                                pixels[p_pos+1] = buffer[j]
-                                pixels[p_pos+2] = buffer[j]
-                            p_pos += 4                                
-                    return pixels
+                pixels = self._get_pixel_buffer(width, height, num_channels)
+                self._back_fill(buffer.reshape(-1, num_channels), pixels, num_channels)
+                return pixels.reshape(-1)
             else:
                 if render and render.use_border:
                     start_x = 0
@@ -1588,45 +1717,24 @@ class RmanRender(object):
 
                 
                     if render.border_min_y > 0.0:
-                        start_y = round(height * render.border_min_y)-1
+                        start_y = max(round(height * render.border_min_y)-1, 0)
                     if render.border_max_y > 0.0:                        
                         end_y = round(height * render.border_max_y)-1 
                     if render.border_min_x > 0.0:
-                        start_x = round(width * render.border_min_x)-1
+                        start_x = max(round(width * render.border_min_x)-1, 0)
                     if render.border_max_x < 1.0:
                         end_x = round(width * render.border_max_x)-2
 
-                    # return the buffer as a list of lists
-                    if back_fill:
-                        pixels = numpy.ones( ((end_x-start_x)*(end_y-start_y), 4), dtype=numpy.float32 )
-                    else:
-                        pixels = numpy.zeros( ((end_x-start_x)*(end_y-start_y), num_channels) )
-                    p_pos = 0
-                    for y in range(start_y, end_y):
-                        i = (width * y * num_channels)
-
-                        for x in range(start_x, end_x):
-                            j = i + (num_channels * x)
-                            if (num_channels==4) or not back_fill:
-                                # just slice
-                                pixels[p_pos] = buffer[j:j+num_channels]
-                            else:
-                                pixels[p_pos][0] = buffer[j]                             
-                                if num_channels == 3:
-                                    pixels[p_pos][1] = buffer[j+1]
-                                    pixels[p_pos][2] = buffer[j+2]
-                                elif num_channels == 2:
-                                    pixels[p_pos][1] = buffer[j+1]
-                                elif num_channels == 1:
-                                    pixels[p_pos][1] = buffer[j]
-                                    pixels[p_pos][2] = buffer[j]
-
-                            p_pos += 1
+                    # crop the buffer to the border region
+                    crop = buffer.reshape(height, width, num_channels)[start_y:end_y, start_x:end_x].reshape(-1, num_channels)
+                    if (num_channels == 4) or not back_fill:
+                        return crop
 
+                    pixels = self._get_pixel_buffer(end_x-start_x, end_y-start_y, num_channels)
+                    self._back_fill(crop, pixels, num_channels)
                     return pixels
                 else:
-                    buffer.shape = (-1, num_channels)
-                    return buffer
+                    return buffer.reshape(-1, num_channels)
         except Exception as e:
             rfb_log().debug("Could not get buffer: %s" % str(e))
             return None                                     
@@ -0,0 +1,165 @@
+import subprocess
+import os
+import math
+import time
+import bpy
+from .rfb_utils import string_utils
+from .rfb_logger import rfb_log
+
+# script the worker processes run. Exports RIB for a chunk of
+# frames using the regular external render path, without spooling.
+# render.render doesn't tell us if the export failed, so make sure all 
+# of the chunk's RIB files were written, and exit with an error if not.
+__RMAN_RIB_WORKER_SCRIPT__ = '''
+import bpy
+import os
+import sys
+import time
+scene = bpy.data.scenes[%r]
+rm = scene.renderman
+scene.frame_start = %d
+scene.frame_end = %d
+rm.external_animation = True
+rm.queuing_system = 'none'
+rm.rib_export_processes = 1
+rm.enable_external_rendering = True
+time_start = time.time()
+bpy.ops.render.render(scene=%r, layer=%r)
+for rib_file in %r:
+    if not os.path.exists(rib_file) or os.path.getmtime(rib_file) < time_start:
+        print("RIB file was not written: %%s" %% rib_file)
+        sys.exit(1)
+'''
+
+class RmanRibExportWorkers(object):
+    '''
+    Export RIB files for an animation in parallel. The frame range is split
+    into chunks of consecutive frames, and a background Blender process is
+    launched for each chunk. Each process exports its frames the same
+    way start_external_render does.
+
+    Attributes:
+    rman_render (RmanRender) - the RmanRender instance
+    bl_scene (bpy.types.Scene) - the scene to export
+    bl_view_layer_name (str) - name of the view layer to export
+    bl_filename (str) - the .blend file the workers should load
+    frames (list) - all of the frames to export
+    '''
+
+    def __init__(self, rman_render, bl_scene, bl_view_layer_name, bl_filename):
+        self.rman_render = rman_render
+        self.bl_scene = bl_scene
+        self.bl_view_layer_name = bl_view_layer_name
+        self.bl_filename = bl_filename
+        self.frames = list(range(bl_scene.frame_start, bl_scene.frame_end + 1, bl_scene.frame_step))
+
+    def get_num_workers(self):
+        '''
+        Get the number of worker processes to launch, based on
+        the rib_export_processes setting.
+
+        Returns:
+        (int) - number of worker processes
+        '''
+        num_workers = self.bl_scene.renderman.rib_export_processes
+        if num_workers < 1:
+            num_workers = os.cpu_count() or 1
+        return max(min(num_workers, len(self.frames)), 1)
+
+    def get_chunks(self, num_workers):
+        '''
+        Split the frames into chunks of consecutive frames, one for each worker.
+        Keeping the frames consecutive lets each worker take advantage of
+        exporting frame deltas (see rib_export_deltas).
+
+        Arguments:
+        num_workers (int) - number of worker processes
+
+        Returns:
+        (list) - list of lists of frames
+        '''
+        chunk_size = int(math.ceil(len(self.frames) / float(num_workers)))
+        return [self.frames[i:i+chunk_size] for i in range(0, len(self.frames), chunk_size)]
+
+    def _get_rib_files(self):
+        # the RIB file for each frame, keyed by frame
+        rm = self.bl_scene.renderman
+        string_utils.set_var('scene', self.bl_scene.name.replace(' ', '_'))
+        string_utils.set_var('layer', self.bl_view_layer_name.replace(' ', '_'))
+        return dict([(frame, string_utils.expand_string(rm.path_rib_output, frame=frame, asFilePath=True)) for frame in self.frames])
+
+    def _count_finished(self, rib_files, time_start):
+        count = 0
+        for rib_file in rib_files:
+            try:
+                if os.path.getmtime(rib_file) >= time_start:
+                    count += 1
+            except OSError:
+                pass
+        return count
+
+    def _launch_worker(self, chunk, rib_files):
+        chunk_rib_files = [rib_files[frame] for frame in chunk]
+        script = __RMAN_RIB_WORKER_SCRIPT__ % (self.bl_scene.name, chunk[0], chunk[-1],
+                                               self.bl_scene.name, self.bl_view_layer_name,
+                                               chunk_rib_files)
+        args = [bpy.app.binary_path, '-b', self.bl_filename, 
+                '--python-exit-code', '1', '--python-expr', script]
+        rfb_log().debug("Launching RIB export worker for frames %d-%d" % (chunk[0], chunk[-1]))
+        return subprocess.Popen(args, env=dict(os.environ))
+
+    def _kill_workers(self, workers):
+        for w in workers:
+            if w.poll() is None:
+                w.kill()
+                w.wait()
+
+    def run(self):
+        '''
+        Launch the worker processes and wait for them to finish. Progress is
+        reported to the stats manager, based on the number of RIB files written.
+        If one of the workers fails, the rest of the workers are stopped.
+
+        Returns:
+        (bool) - True if all of the workers were successful, and all of the
+        RIB files were written
+        '''
+        num_workers = self.get_num_workers()
+        chunks = self.get_chunks(num_workers)
+        rib_files = self._get_rib_files()
+        total = len(rib_files)
+        stats_mgr = self.rman_render.stats_mgr
+
+        rfb_log().info("Writing RIB for %d frames with %d processes..." % (total, len(chunks)))
+        time_start = time.time()
+        workers = []
+        try:
+            for chunk in chunks:
+                workers.append(self._launch_worker(chunk, rib_files))
+
+            num_finished = 0
+            while any([w.poll() is None for w in workers]):
+                if any([w.returncode not in (None, 0) for w in workers]):
+                    rfb_log().error("A RIB export worker failed. Stopping the remaining workers.")
+                    self._kill_workers(workers)
+                    break
+                time.sleep(0.5)
+                count = self._count_finished(rib_files.values(), time_start)
+                if count != num_finished:
+                    num_finished = count
+                    stats_mgr.set_export_stats("Writing RIB (%d/%d frames)" % (num_finished, total), num_finished / total)
+                    rfb_log().debug("Finished writing RIB for %d/%d frames" % (num_finished, total))
+        finally:
+            self._kill_workers(workers)
+
+        failed = [chunk for chunk, w in zip(chunks, workers) if w.returncode != 0]
+        for chunk in failed:
+            rfb_log().error("RIB export failed for frames %d-%d" % (chunk[0], chunk[-1]))
+
+        num_finished = self._count_finished(rib_files.values(), time_start)
+        if num_finished != total:
+            rfb_log().error("Only %d/%d RIB files were written" % (num_finished, total))
+
+        stats_mgr.set_export_stats("Finished writing RIB", 1.0)
+        rfb_log().info("Finished writing RIB. Total time: %s" % string_utils._format_time_(time.time() - time_start))
+        return (not failed) and (len(workers) == len(chunks)) and (num_finished == total)
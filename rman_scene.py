@@ -51,6 +51,9 @@ from .rman_sg_nodes.rman_sg_node import RmanSgNode
 import bpy
 import os
 import sys
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 class RmanScene(object):
     '''
@@ -92,6 +95,14 @@ class RmanScene(object):
         num_objects_in_viewlayer (int) - the current number of objects in the current view layer. We're using this
                                        to keep track if an object was removed from a collection
         objects_in_viewlayer (list) - the list of objects (bpy.types.Object) in this view layer.
+        rman_mesh_payloads (dict) - dictionary of pre-processed RmanMeshPayload(s) waiting to be
+                                    committed to the scene graph, keyed by prototype key
+        light_link_index (dict) - light linking information, used to build the lighting and lightfilter
+                                  subsets of each object. Built on demand, and set to None when lights
+                                  or light links change.
+        object_group_index (dict) - maps original objects to the names of the object groups (trace sets)
+                                    they are members of. Built on demand, and set to None when
+                                    object groups could have changed.
     '''
 
     def __init__(self, rman_render=None):
@@ -122,6 +133,9 @@ class RmanScene(object):
         self.obj_hash = dict()
         self.moving_objects = dict()
         self.rman_prototypes = dict()
+        self.rman_mesh_payloads = dict()
+        self.light_link_index = None
+        self.object_group_index = None
 
         self.motion_steps = set()
         self.main_camera = None
@@ -189,6 +203,10 @@ class RmanScene(object):
         self.motion_steps = set()
         self.moving_objects.clear()
         self.rman_prototypes.clear()
+        self.rman_mesh_payloads.clear()
+        self.light_link_index = None
+        self.object_group_index = None
+        object_utils.clear_key_cache()
 
         self.main_camera = None
         self.render_default_light = False
@@ -541,7 +559,104 @@ class RmanScene(object):
             attrs.SetString(self.rman.Tokens.Rix.k_lightfilter_subset, ','. join(all_lightfilters) )
 
         if rixattrs is None:
-            root_sg.SetAttributes(attrs)           
+            root_sg.SetAttributes(attrs)
+
+    def _build_light_link_index(self):
+        rm = self.bl_scene.renderman
+        lights = dict() # object -> list of lights linked to the object
+        lightfilters = dict() # object -> list of light filters linked to the object
+        all_lights = [string_utils.sanitize_node_name(l.name) for l in scene_utils.get_all_lights(self.bl_scene, include_light_filters=False)]
+        all_lightfilters = [string_utils.sanitize_node_name(l.name) for l in scene_utils.get_all_lightfilters(self.bl_scene)]
+        linked_lights = set()
+        linked_lightfilters = set()
+
+        for ll in rm.light_links:
+            light_ob = ll.light_ob
+            light_props = shadergraph_utils.get_rman_light_properties_group(light_ob)
+            nm = string_utils.sanitize_node_name(light_ob.name)
+            if light_props.renderman_light_role == 'RMAN_LIGHT':
+                subsets = lights
+                linked_lights.add(nm)
+            elif light_props.renderman_light_role == 'RMAN_LIGHTFILTER':
+                subsets = lightfilters
+                linked_lightfilters.add(nm)
+            else:
+                continue
+            for member in ll.members:
+                if member.ob_pointer is None:
+                    continue
+                ob_subset = subsets.setdefault(member.ob_pointer.original, list())
+                if not ob_subset or ob_subset[-1] != nm:
+                    ob_subset.append(nm)
+
+        self.light_link_index = {
+            'lights': lights,
+            'lightfilters': lightfilters,
+            # lights and light filters that are not linked to anything
+            'other_lights': [nm for nm in all_lights if nm not in linked_lights],
+            'other_lightfilters': [nm for nm in all_lightfilters if nm not in linked_lightfilters],
+            'subsets': dict()
+        }
+
+    def get_light_link_subsets(self, ob):
+        '''
+        Get the lighting and lightfilter subsets for an object, when light 
+        linking is inverted. The light linking index is built on the first call.
+
+        Arguments:
+        ob (bpy.types.Object) - the object
+
+        Returns:
+        (tuple) - the lighting subset and lightfilter subset strings. Either can be
+        an empty string, if the object is not linked to any lights or light filters.
+        '''
+        if self.light_link_index is None:
+            self._build_light_link_index()
+
+        index = self.light_link_index
+        ob_key = ob.original
+        subsets = index['subsets'].get(ob_key, None)
+        if subsets is None:
+            lighting_subset = ''
+            lightfilter_subset = ''
+            lights = index['lights'].get(ob_key, None)
+            if lights:
+                # include all other lights that are not linked
+                lighting_subset = ','.join(lights + index['other_lights'])
+            lightfilters = index['lightfilters'].get(ob_key, None)
+            if lightfilters:
+                lightfilter_subset = ','.join(lightfilters + index['other_lightfilters'])
+            subsets = (lighting_subset, lightfilter_subset)
+            index['subsets'][ob_key] = subsets
+        return subsets
+
+    def get_object_groups(self, ob):
+        '''
+        Get the comma separated names of the object groups an object is a member of.
+        The object group index is built on the first call.
+
+        Arguments:
+        ob (bpy.types.Object) - the object
+
+        Returns:
+        (str) - the object group names, or an empty string if the object
+        is not in any object groups
+        '''
+        if self.object_group_index is None:
+            index = dict()
+            for obj_group in self.bl_scene.renderman.object_groups:
+                group_name = obj_group.name
+                members = set()
+                for member in obj_group.members:
+                    if member.ob_pointer is None:
+                        continue
+                    ob_key = member.ob_pointer.original
+                    if ob_key in members:
+                        continue
+                    members.add(ob_key)
+                    index.setdefault(ob_key, list()).append(group_name)
+            self.object_group_index = {k: ','.join(v) for k, v in index.items()}
+        return self.object_group_index.get(ob.original, '')           
 
     def export_root_sg_node(self):
 
@@ -655,20 +770,7 @@ class RmanScene(object):
                 rman_sg_group.sg_node.AddChild(rman_sg_node.rman_sg_particle_group_node.sg_node)
 
         # Attach any material overrides
-        if is_empty_instancer:
-            if instance_parent.renderman.rman_material_override:
-                rman_sg_group.sg_node.SetMaterial(None)
-            else:
-                # if there is not a material override, we want
-                # the material of the object
-                self.attach_material(ob_eval, rman_sg_group)        
-        elif psys:
-            self.attach_particle_material(psys.settings, instance_parent, ob_eval, rman_sg_group)
-            rman_sg_group.bl_psys_settings = psys.settings.original     
-        elif ob_eval.renderman.rman_material_override:
-            self.attach_material(ob_eval, rman_sg_group) 
-        else:
-            rman_sg_group.sg_node.SetMaterial(None)                   
+        self._attach_instance_material(ob_eval, rman_sg_group, instance_parent, psys, is_empty_instancer)
 
         if is_empty_instancer:
             # if this is an empty instancer, add as a child to the empty instancer
@@ -698,8 +800,217 @@ class RmanScene(object):
         rman_group_translator.update_transform(ob_inst, rman_sg_group)
         return rman_sg_group
 
+    def _attach_instance_material(self, ob_eval, rman_sg_group, instance_parent, psys, is_empty_instancer):
+        if is_empty_instancer:
+            if instance_parent.renderman.rman_material_override:
+                rman_sg_group.sg_node.SetMaterial(None)
+            else:
+                # if there is not a material override, we want
+                # the material of the object
+                self.attach_material(ob_eval, rman_sg_group)        
+        elif psys:
+            self.attach_particle_material(psys.settings, instance_parent, ob_eval, rman_sg_group)
+            rman_sg_group.bl_psys_settings = psys.settings.original     
+        elif ob_eval.renderman.rman_material_override:
+            self.attach_material(ob_eval, rman_sg_group) 
+        else:
+            rman_sg_group.sg_node.SetMaterial(None)                   
+
+    def _get_instance_template_key(self, ob_inst, proto_key, instance_parent, psys):
+        # Instances with the same key share everything except for
+        # their transform, persistent id and instance uv
+        psys_name = psys.name if psys else ''
+        return (proto_key, ob_inst.object.name_full, instance_parent.name_full, psys_name)
+
+    def _create_instance_template(self, ob_inst, rman_sg_node, rman_sg_group, instance_parent, psys, rman_type):
+        '''
+        Create a template from the first exported instance of an instancer. The template
+        is used by _export_instance_from_template to export the rest of the instances
+        without having to recompute the attributes and names that are the same for all
+        of them.
+
+        Arguments:
+        ob_inst (bpy.types.DepsgraphObjectInstance) - the instance that was just exported
+        rman_sg_node (RmanSgNode) - the prototype
+        rman_sg_group (RmanSgGroup) - the group that was created for ob_inst
+        instance_parent (bpy.types.Object) - the instancer
+        psys (bpy.types.ParticleSystem) - the particle system, if this is a particle instance
+        rman_type (str) - the RenderMan type of the prototype
+
+        Returns:
+        (dict) - the template
+        '''
+        persistent_id = "%d%d" % (ob_inst.persistent_id[1], ob_inst.persistent_id[0])
+        is_empty_instancer = object_utils.is_empty_instancer(instance_parent)
+        rman_parent_node = None
+        if psys or is_empty_instancer:
+            rman_parent_node = self.get_rman_prototype(object_utils.prototype_key(instance_parent), ob=instance_parent, create=True)
+        name = instance_parent.name
+        template = {
+            'attrs': rman_sg_group.sg_node.GetAttributes(),
+            'db_name_prefix': rman_sg_group.db_name[:-len(persistent_id)],
+            'name': name,
+            'name_id': int(hashlib.sha1(name.encode()).hexdigest(), 16) % 10**8,
+            'is_empty_instancer': is_empty_instancer,
+            # procedurals get a user:procprimid that's unique for each instance
+            # (see RmanTranslator.export_instance_attributes)
+            'has_procprimid': rman_type in ['DELAYED_LOAD_ARCHIVE', 'ALEMBIC', 'PROCEDURAL_RUN_PROGRAM', 'DYNAMIC_LOAD_DSO'],
+            'instances': rman_parent_node.instances if (psys and rman_parent_node) else rman_sg_node.instances,
+            'sg_parent': rman_parent_node.sg_attributes if is_empty_instancer else rman_sg_node.sg_attributes,
+            'motion_steps': rman_sg_group.motion_steps if rman_sg_group.is_transforming else None
+        }
+        return template
+
+    def _export_instance_from_template(self, ob_eval, ob_inst, rman_sg_node, instance_parent, psys, template):
+        '''
+        Export an instance using a template created by _create_instance_template. This
+        should give the same result as export_instance.
+        '''
+        rman_group_translator = self.rman_translators['GROUP']
+        group_db_name = "%s%d%d" % (template['db_name_prefix'], ob_inst.persistent_id[1], ob_inst.persistent_id[0])
+        rman_sg_group = template['instances'].get(group_db_name, None)
+        if rman_sg_group is None:
+            rman_sg_group = rman_group_translator.export(None, group_db_name)
+            rman_sg_group.sg_node.AddChild(rman_sg_node.sg_node)
+            template['instances'][group_db_name] = rman_sg_group
+
+        # instance attributes
+        attrs = template['attrs']
+        persistent_id = ob_inst.persistent_id[1]
+        if persistent_id == 0:
+            persistent_id = template['name_id']
+        self.obj_hash[persistent_id] = template['name']
+        attrs.SetInteger(self.rman.Tokens.Rix.k_identifier_id, persistent_id)
+        attrs.SetFloatArray('user:blender_instance_uv', ob_inst.uv, 2)
+        if template['has_procprimid']:
+            id = int(hashlib.sha1(group_db_name.encode()).hexdigest(), 16) % 10**8
+            attrs.SetFloat('user:procprimid', float(id))
+        rman_sg_group.sg_node.SetAttributes(attrs)
+
+        # Add any particles necessary
+        if rman_sg_node.rman_sg_particle_group_node:
+            if (len(ob_eval.particle_systems) > 0) and ob_inst.show_particles:
+                rman_sg_group.sg_node.AddChild(rman_sg_node.rman_sg_particle_group_node.sg_node)
+
+        self._attach_instance_material(ob_eval, rman_sg_group, instance_parent, psys, template['is_empty_instancer'])
+        template['sg_parent'].AddChild(rman_sg_group.sg_node)
+
+        if template['motion_steps']:
+            rman_sg_group.motion_steps = template['motion_steps']
+            rman_sg_group.is_transforming = True
+            self.moving_objects[ob_inst.object.name_full] = ob_inst.object
+
+        rman_sg_group.sg_node.SetInheritTransform(False) # we don't want to inherit the transform                
+        rman_group_translator.update_transform(ob_inst, rman_sg_group)
+        return rman_sg_group
+
+
+    def _get_export_threads(self):
+        num_threads = get_pref('rman_export_threads', default=0)
+        if num_threads < 1:
+            num_threads = os.cpu_count() or 1
+        return num_threads
+
+    def _gather_mesh_prototypes(self, selected_objects=False, objects_list=False):
+        # Find all of the mesh prototypes that still need to be exported.
+        # Use the same filtering as export_data_blocks.
+        # Instances are skipped. Their object is a temporary that is only valid 
+        # while iterating over object_instances, and we hold onto these
+        # until the commit step. They are exported by export_data_blocks.
+        mesh_prototypes = dict()
+        for ob_inst in self.depsgraph.object_instances:
+            if ob_inst.is_instance:
+                continue
+            ob = ob_inst.object
+            if ob.type != 'MESH':
+                continue
+
+            if selected_objects and not self.is_instance_selected(ob_inst):
+                continue
+
+            if objects_list and ob.original not in objects_list:
+                continue
+
+            proto_key = object_utils.prototype_key(ob_inst)
+            if proto_key in self.rman_prototypes or proto_key in mesh_prototypes:
+                continue
+
+            if not self.check_visibility(ob_inst):
+                continue
+
+            ob_eval = ob.evaluated_get(self.depsgraph)
+            if object_utils._detect_primitive_(ob_eval) != 'MESH':
+                continue
+            mesh_prototypes[proto_key] = ob_eval
+
+        return list(mesh_prototypes.items())
+
+    def export_mesh_prototypes(self, selected_objects=False, objects_list=False):
+        '''
+        Export all of the mesh prototypes, using a pool of threads to do the numpy work.
+        This is done in three stages for each batch of prototypes:
+
+        1. Read the mesh buffers from Blender. This needs to be on the main thread.
+        2. Process the buffers (RmanMeshPayload.process) on the thread pool. This 
+           assembles the primvar buffers, subdivision tags and face sets.
+        3. Commit the processed payloads to the scene graph, on the main thread.
+
+        Only prototypes of objects that aren't instances go through this pipeline.
+
+        While the thread pool is processing one batch, the main thread gathers
+        the next one.
+        '''
+        num_threads = self._get_export_threads()
+        if num_threads < 2:
+            return
+
+        mesh_prototypes = self._gather_mesh_prototypes(selected_objects=selected_objects, objects_list=objects_list)
+        total = len(mesh_prototypes)
+        if total < 2:
+            return
+
+        translator = self.rman_translators['MESH']
+        batch_size = max(num_threads * 4, 16)
+        batches = [mesh_prototypes[i:i+batch_size] for i in range(0, total, batch_size)]
+        num_committed = 0
+
+        def commit_batch(batch, futures):
+            nonlocal num_committed
+            for (proto_key, ob_eval), future in zip(batch, futures):
+                payload = future.result()
+                if payload is not None:
+                    self.rman_mesh_payloads[proto_key] = payload
+                self.get_rman_prototype(proto_key, ob=ob_eval, create=True)
+                self.rman_mesh_payloads.pop(proto_key, None)
+                num_committed += 1
+                self.rman_render.stats_mgr.set_export_stats("Exporting prototypes", num_committed/total)
+
+        rfb_log().debug("Exporting %d mesh prototypes using %d threads" % (total, num_threads))
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            pending = deque()
+            for batch in batches:
+                futures = list()
+                for proto_key, ob_eval in batch:
+                    mesh = ob_eval.to_mesh()
+                    if not mesh:
+                        futures.append(executor.submit(lambda: None))
+                        continue
+                    payload = translator.gather_payload(ob_eval, mesh)
+                    ob_eval.to_mesh_clear()
+                    futures.append(executor.submit(payload.process))
+                pending.append((batch, futures))
+
+                # commit the previous batch, while this one is being processed
+                if len(pending) > 1:
+                    commit_batch(*pending.popleft())
+
+            while pending:
+                commit_batch(*pending.popleft())
 
     def export_data_blocks(self, selected_objects=False, objects_list=False):
+        self.export_mesh_prototypes(selected_objects=selected_objects, objects_list=objects_list)
+        # templates for instances coming from instancers (particles, geometry nodes, etc.)
+        instance_templates = dict()
         total = len(self.depsgraph.object_instances)
         for i, ob_inst in enumerate(self.depsgraph.object_instances):
             ob = ob_inst.object
@@ -738,7 +1049,19 @@ class RmanScene(object):
             if rman_type in object_utils._RMAN_NO_INSTANCES_:
                 continue
 
-            self.export_instance(ob_eval, ob_inst, rman_sg_node, rman_type, instance_parent, psys)
+            if not instance_parent or rman_type == 'META' or rman_type not in self.rman_translators:
+                self.export_instance(ob_eval, ob_inst, rman_sg_node, rman_type, instance_parent, psys)
+                continue
+
+            # For instancers, export the first instance the regular way, and use
+            # it as a template for the rest
+            key = self._get_instance_template_key(ob_inst, proto_key, instance_parent, psys)
+            template = instance_templates.get(key, None)
+            if template:
+                self._export_instance_from_template(ob_eval, ob_inst, rman_sg_node, instance_parent, psys, template)
+            else:
+                rman_sg_group = self.export_instance(ob_eval, ob_inst, rman_sg_node, rman_type, instance_parent, psys)
+                instance_templates[key] = self._create_instance_template(ob_inst, rman_sg_node, rman_sg_group, instance_parent, psys, rman_type)
 
     def export_data_block(self, proto_key, ob):
         rman_type = object_utils._detect_primitive_(ob)
@@ -801,7 +1124,11 @@ class RmanScene(object):
             if mb_deform_segs < 1:
                 rman_sg_node.is_deforming = False
 
-        translator.update(ob, rman_sg_node)
+        payload = self.rman_mesh_payloads.get(proto_key, None)
+        if payload:
+            translator.update(ob, rman_sg_node, payload=payload)
+        else:
+            translator.update(ob, rman_sg_node)
         
         # set object attributes
         attrs = rman_sg_node.sg_attributes.GetAttributes()
@@ -854,10 +1181,91 @@ class RmanScene(object):
 
         return rman_sg_node
 
-    def export_instances_motion(self, selected_objects=False):
-        origframe = self.bl_scene.frame_current
+    def _get_motion_instance(self, ob_inst, selected_objects=False):
+        # Figure out if ob_inst is transforming or deforming. Returns a dictionary
+        # with everything needed to export its motion samples, or None if 
+        # there's nothing to export for this instance.
+        if selected_objects and not self.is_instance_selected(ob_inst):
+            return None
+
+        if not self.check_visibility(ob_inst):
+            return None
+
+        psys = None
+        ob = ob_inst.object.evaluated_get(self.depsgraph)
+        instance_parent = None
+        if ob_inst.is_instance:
+            psys = ob_inst.particle_system
+            instance_parent = ob_inst.parent
+
+        rman_type = object_utils._detect_primitive_(ob)
+        if rman_type in object_utils._RMAN_NO_INSTANCES_:
+            return None
+
+        # object is not moving and not part of a particle system
+        if ob.name_full not in self.moving_objects and not psys:
+            return None
 
-        mb_segs = self.bl_scene.renderman.motion_segments
+        proto_key = object_utils.prototype_key(ob_inst)
+        rman_sg_node = self.get_rman_prototype(proto_key, ob=ob)
+        if not rman_sg_node:
+            return None
+
+        rman_sg_group = self.get_rman_sg_instance(ob_inst, rman_sg_node, instance_parent, psys)
+        if not rman_sg_group:
+            return None
+
+        # map each time sample to its index in the motion steps. If a time
+        # sample is repeated, keep its first index, like motion_steps.index() did
+        transform_steps = None
+        if rman_sg_group.is_transforming or psys:
+            transform_steps = dict()
+            for i, s in enumerate(rman_sg_group.motion_steps):
+                transform_steps.setdefault(s, i)
+
+        deform_steps = None
+        translator = None
+        if rman_sg_node.is_deforming and rman_sg_node.rman_type in ['MESH', 'FLUID', 'CURVES']:
+            translator = self.rman_translators.get(rman_sg_node.rman_type, None)
+            if translator:
+                deform_steps = dict()
+                for i, s in enumerate(rman_sg_node.deform_motion_steps):
+                    deform_steps.setdefault(s, i)
+
+        if not transform_steps and not deform_steps:
+            return None
+
+        return {
+            'group_db_name': object_utils.get_group_db_name(ob_inst),
+            'rman_sg_node': rman_sg_node,
+            'rman_sg_group': rman_sg_group,
+            'transform_steps': transform_steps,
+            'deform_steps': deform_steps,
+            'translator': translator
+        }
+
+    def _export_motion_sample(self, ob_inst, motion_instance, seg, time_samp, first_sample, deformed):
+        rman_sg_node = motion_instance['rman_sg_node']
+        rman_sg_group = motion_instance['rman_sg_group']
+
+        # transformation blur
+        transform_steps = motion_instance['transform_steps']
+        if transform_steps and seg in transform_steps:
+            rman_group_translator = self.rman_translators['GROUP']
+            if first_sample:
+                rman_group_translator.update_transform_num_samples(rman_sg_group, rman_sg_group.motion_steps ) 
+            rman_group_translator.update_transform_sample( ob_inst, rman_sg_group, transform_steps[seg], time_samp)
+
+        # deformation blur
+        # all instances of the prototype share the same geometry,
+        # so only export the sample once
+        deform_steps = motion_instance['deform_steps']
+        if deform_steps and seg in deform_steps and rman_sg_node not in deformed:
+            ob = ob_inst.object.evaluated_get(self.depsgraph)
+            motion_instance['translator'].export_deform_sample(rman_sg_node, ob, deform_steps[seg])
+            deformed.add(rman_sg_node)
+
+    def export_instances_motion(self, selected_objects=False):
         origframe = self.bl_scene.frame_current
 
         motion_steps = sorted(list(self.motion_steps))
@@ -866,8 +1274,12 @@ class RmanScene(object):
         delta = 0.0
         if len(motion_steps) > 0:
             delta = -motion_steps[0]
-        psys_translator = self.rman_translators['PARTICLES']
-        rman_group_translator = self.rman_translators['GROUP']
+
+        # Instances that are moving or deforming, keyed by their index in
+        # depsgraph.object_instances. This gets filled in on the first time sample,
+        # so that the rest of the time samples only need to look at these instances.
+        moving_instances = None
+        num_instances = 0
         for samp, seg in enumerate(motion_steps):
             first_sample = (samp == 0)
             if seg < 0.0:
@@ -876,9 +1288,10 @@ class RmanScene(object):
                 self.rman_render.bl_engine.frame_set(origframe, subframe=seg)
 
             self.depsgraph.update()
+            # the depsgraph was re-evaluated, any cached keys are no longer valid
+            object_utils.clear_key_cache()
             time_samp = seg + delta # get the normlized version of the segment
             total = len(self.depsgraph.object_instances)
-            objFound = False
 
             # update camera
             if not first_sample and self.main_camera.is_transforming and seg in self.main_camera.motion_steps:
@@ -890,86 +1303,58 @@ class RmanScene(object):
                         break
                 cam_translator.update_transform(self.depsgraph.scene_eval.camera, self.main_camera, idx, time_samp)
 
-            rfb_log().debug(" Export Sample: %i" % samp)
-            for i, ob_inst in enumerate(self.depsgraph.object_instances):
-                if selected_objects and not self.is_instance_selected(ob_inst):
-                    continue
-
-                if not self.check_visibility(ob_inst):
-                    continue
-
-                psys = None
-                ob = ob_inst.object.evaluated_get(self.depsgraph)
-                proto_key = object_utils.prototype_key(ob_inst)
-                rfb_log().debug("   Exported %d/%d motion instances... (%s)" % (i, total, ob.name))
-                self.rman_render.stats_mgr.set_export_stats("Exporting motion instances (%d) " % samp ,i/total)
-                instance_parent = None
-                if ob_inst.is_instance:
-                    psys = ob_inst.particle_system
-                    instance_parent = ob_inst.parent
-
-                rman_type = object_utils._detect_primitive_(ob)
-                if rman_type in object_utils._RMAN_NO_INSTANCES_:
-                    continue
+            if moving_instances is not None and total != num_instances:
+                # the number of instances changed between time samples (ex: particles 
+                # being born or dying), the indices are no longer reliable
+                rfb_log().debug(" Number of instances changed during motion blur: %d -> %d" % (num_instances, total))
+                moving_instances = None
 
-                # check particles for motion
-                '''
-                for psys in ob.particle_systems:
-                    ob_psys = self.rman_particles.get(proto_key, None)
-                    if not ob_psys:
-                        continue
-                    rman_sg_particles = ob_psys.get(psys.settings.original, None)
-                    if not rman_sg_particles:
-                        continue
-                    if not seg in rman_sg_particles.motion_steps:
+            rfb_log().debug(" Export Sample: %i" % samp)
+            deformed = set()
+            if moving_instances is None:
+                moving_instances = dict()
+                num_instances = total
+                for i, ob_inst in enumerate(self.depsgraph.object_instances):
+                    rfb_log().debug("   Exported %d/%d motion instances..." % (i, total))
+                    self.rman_render.stats_mgr.set_export_stats("Exporting motion instances (%d) " % samp ,i/total)
+                    motion_instance = self._get_motion_instance(ob_inst, selected_objects=selected_objects)
+                    if motion_instance is None:
                         continue
-                    idx = 0
-                    for i, s in enumerate(rman_sg_particles.motion_steps):
-                        if s == seg:
-                            idx = i
-                            break
-                    psys_translator.export_deform_sample(rman_sg_particles, ob, psys, idx)
-                '''
-
-                # object is not moving and not part of a particle system
-                if ob.name_full not in self.moving_objects and not psys:
-                    continue
-
-                rman_sg_node = self.get_rman_prototype(proto_key, ob=ob)
-                if not rman_sg_node:
-                    continue
+                    moving_instances[i] = motion_instance
+                    self._export_motion_sample(ob_inst, motion_instance, seg, time_samp, first_sample, deformed)
+                continue
 
-                rman_sg_group = self.get_rman_sg_instance(ob_inst, rman_sg_node, instance_parent, psys)
-                if not rman_sg_group:
+            num_moving = len(moving_instances)
+            exported = 0
+            for i, ob_inst in enumerate(self.depsgraph.object_instances):
+                motion_instance = moving_instances.get(i, None)
+                if motion_instance is None:
                     continue
+                exported += 1
+                self.rman_render.stats_mgr.set_export_stats("Exporting motion instances (%d) " % samp, exported/num_moving)
+                if object_utils.get_group_db_name(ob_inst) != motion_instance['group_db_name']:
+                    # this is not the same instance as the first time sample
+                    motion_instance = self._get_motion_instance(ob_inst, selected_objects=selected_objects)
+                    if motion_instance is None:
+                        continue
+                    moving_instances[i] = motion_instance
+                self._export_motion_sample(ob_inst, motion_instance, seg, time_samp, first_sample, deformed)
+                if exported == num_moving:
+                    break
 
-                # transformation blur
-                if seg in rman_sg_group.motion_steps:
-                    idx = 0
-                    for i, s in enumerate(rman_sg_group.motion_steps):
-                        if s == seg:
-                            idx = i
-                            break
-
-                    if rman_sg_group.is_transforming or psys:
-                        if first_sample:
-                            rman_group_translator.update_transform_num_samples(rman_sg_group, rman_sg_group.motion_steps ) 
-                        rman_group_translator.update_transform_sample( ob_inst, rman_sg_group, idx, time_samp)
-
-                # deformation blur
-                if rman_sg_node.is_deforming and seg in rman_sg_node.deform_motion_steps:
-                    rman_type = rman_sg_node.rman_type
-                    if rman_type in ['MESH', 'FLUID', 'CURVES']:
-                        translator = self.rman_translators.get(rman_type, None)
-                        if translator:
-                            deform_idx = 0
-                            for i, s in enumerate(rman_sg_node.deform_motion_steps):
-                                if s == seg:
-                                    deform_idx = i
-                                    break
-                            translator.export_deform_sample(rman_sg_node, ob, deform_idx)
+        # set the deformation samples for any meshes that were not found
+        # for every time sample, so none of them are left behind
+        for rman_sg_node in self.rman_prototypes.values():
+            if not getattr(rman_sg_node, 'deform_samples', None):
+                continue
+            translator = self.rman_translators.get(rman_sg_node.rman_type, None)
+            if translator and hasattr(translator, 'flush_deform_samples'):
+                translator.flush_deform_samples(rman_sg_node)
+            else:
+                rman_sg_node.deform_samples.clear()
 
         self.rman_render.bl_engine.frame_set(origframe, subframe=0)
+        object_utils.clear_key_cache()
         rfb_log().debug("   Finished exporting motion instances")
         self.rman_render.stats_mgr.set_export_stats("Finished exporting motion instances", 100)
 
@@ -620,6 +620,11 @@ class RmanSceneSync(object):
         self.rman_scene.context = context     
         self.rman_scene.bl_view_layer = depsgraph.view_layer_eval
 
+        # lights, light links or object groups may have changed
+        self.rman_scene.light_link_index = None
+        self.rman_scene.object_group_index = None
+        object_utils.clear_key_cache()
+
         # update the frame number
         options = self.rman_scene.sg_scene.GetOptions()
         options.SetInteger(self.rman.Tokens.Rix.k_Ri_Frame, self.rman_scene.bl_frame_current) 
@@ -655,6 +660,26 @@ class RmanSceneSync(object):
                 elif isinstance(dps_update.id, bpy.types.GeometryNodeTree):
                     # create an empty RmanUpdate
                     self.create_rman_update(dps_update.id.original, clear_instances=False)                    
+
+            # objects marked as frame sensitive need to be updated, 
+            # even if the depsgraph says they didn't change
+            for id in depsgraph.ids:
+                if not isinstance(id, bpy.types.Object):
+                    continue
+                o = id.original
+                if o in self.rman_updates:
+                    continue
+                if o.type == 'CAMERA':
+                    rman_sg_node = self.rman_scene.rman_cameras.get(o, None)
+                    if rman_sg_node and rman_sg_node.is_frame_sensitive:
+                        self.camera_updated(id, force_update=True)
+                    continue
+                rman_sg_node = self.rman_scene.get_rman_prototype(object_utils.prototype_key(o), create=False)
+                if rman_sg_node and rman_sg_node.is_frame_sensitive:
+                    rman_update = RmanUpdate()
+                    rman_update.is_updated_geometry = True
+                    rman_update.is_updated_transform = False
+                    self.rman_updates[o] = rman_update
                                     
             if not self.rman_updates and self.num_instances_changed:
                 # The number of instances changed, but we are not able
@@ -692,6 +717,11 @@ class RmanSceneSync(object):
         self.rman_scene.context = context       
         self.rman_scene.bl_view_layer = depsgraph.view_layer_eval
 
+        # lights, light links or object groups may have changed
+        self.rman_scene.light_link_index = None
+        self.rman_scene.object_group_index = None
+        object_utils.clear_key_cache()
+
         rfb_log().debug("------Start update scene--------")    
        
         # Check the number of instances. If we differ, an object may have been
@@ -772,11 +802,34 @@ class RmanSceneSync(object):
         self.rman_updates = dict()                        
         rfb_log().debug("------End update scene----------")    
 
+    def _user_updated(self, ob, users_cache):
+        # Check if one of the users of ob has an RmanUpdate.
+        # Results are cached in users_cache, keyed by ob, as many instances
+        # can share the same object and user_map is expensive
+        if ob in users_cache:
+            return users_cache[ob]
+
+        user_exist = False
+        users = self.rman_scene.context.blend_data.user_map(subset={ob})
+        for o in users[ob]:
+            if o.original in self.rman_updates:
+                parent = getattr(o.original, 'parent', None)
+                if parent == ob:
+                    # don't consider this object if there's a
+                    # parent/child relation
+                    continue
+                rfb_log().debug("\t%s user updated (%s)" % (ob.name, o.name))
+                user_exist = True
+                break
+        users_cache[ob] = user_exist
+        return user_exist
+
     @time_this
     def check_instances(self, batch_mode=False):
-        deleted_obj_keys = list(self.rman_scene.rman_prototypes) # list of potential objects to delete
-        already_udpated = list() # list of objects already updated during our loop
-        clear_instances = list() # list of objects who had their instances cleared            
+        deleted_obj_keys = set(self.rman_scene.rman_prototypes) # set of potential objects to delete
+        already_udpated = set() # set of objects already updated during our loop
+        clear_instances = set() # set of objects who had their instances cleared            
+        users_cache = dict() # cache of whether one of the users of an object was updated
         rfb_log().debug("Updating instances")        
         with self.rman_scene.rman.SGManager.ScopedEdit(self.rman_scene.sg_scene): 
             for instance in self.rman_scene.depsgraph.object_instances:
@@ -797,8 +850,7 @@ class RmanSceneSync(object):
                     instance_parent = instance.parent 
                     is_empty_instancer = object_utils.is_empty_instancer(instance_parent)
                     
-                if proto_key in deleted_obj_keys:
-                    deleted_obj_keys.remove(proto_key) 
+                deleted_obj_keys.discard(proto_key)
                
                 rman_type = object_utils._detect_primitive_(ob_eval)
                 
@@ -843,7 +895,7 @@ class RmanSceneSync(object):
                     # set update_geometry to False
                     # since we've already exported the datablock                        
                     rman_update.is_updated_geometry = False
-                    clear_instances.append(rman_sg_node)
+                    clear_instances.add(rman_sg_node)
                                                                 
                 if self.check_all_instances:
                     # check all instances in the scene
@@ -861,19 +913,7 @@ class RmanSceneSync(object):
                     # check if one of the users of this object updated
                     # ex: the object was instanced via a GeometryNodeTree, and the 
                     # geometry node tree updated
-                    users = self.rman_scene.context.blend_data.user_map(subset={ob_eval.original})
-                    user_exist = False
-                    for o in users[ob_eval.original]:
-                        if o.original in self.rman_updates:
-                            parent = getattr(o.original, 'parent', None)
-                            if parent == ob_eval.original:
-                                # don't consider this object if there's a
-                                # parent/child relation
-                                continue
-                            rfb_log().debug("\t%s user updated (%s)" % (ob_eval.name, o.name))
-                            user_exist = True
-                            break
-                    if user_exist:
+                    if self._user_updated(ob_eval.original, users_cache):
                         rman_update = self.create_rman_update(ob_key, update_transform=True)
                     else:
                         # check if the instance_parent was the thing that 
@@ -916,7 +956,7 @@ class RmanSceneSync(object):
                                 self.rman_scene.attach_material(ob_eval, rman_sg_node, sg_node=rman_sg_node.sg_attributes)
                                 self.update_particle_emitters(ob_eval)
                             
-                        already_udpated.append(proto_key)   
+                        already_udpated.add(proto_key)
 
                 if rman_type in object_utils._RMAN_NO_INSTANCES_:
                     if rman_type == 'EMPTY':
@@ -932,11 +972,11 @@ class RmanSceneSync(object):
                         if rman_parent_node and rman_parent_node not in clear_instances:
                             rfb_log().debug("\tClearing parent instances: %s" % parent_proto_key)
                             rman_parent_node.clear_instances()
-                            clear_instances.append(rman_parent_node) 
+                            clear_instances.add(rman_parent_node)
                     if rman_sg_node not in clear_instances:
                         rfb_log().debug("\tClearing instances: %s" % proto_key)
                         rman_sg_node.clear_instances()
-                        clear_instances.append(rman_sg_node) 
+                        clear_instances.add(rman_sg_node)
 
                     if not self.rman_scene.check_visibility(instance):
                          # This instance is not visible in the viewport. Don't
@@ -948,8 +988,8 @@ class RmanSceneSync(object):
                     if rman_sg_node not in clear_instances:
                         # this might be a bit werid, but we don't want another RmanUpdate
                         # instance to clear the instances afterwards, so we add to the
-                        # clear_instances list
-                        clear_instances.append(rman_sg_node) 
+                        # clear_instances set
+                        clear_instances.add(rman_sg_node)
 
                     # simply grab the existing instance and update the transform and/or material
                     rman_sg_group = self.rman_scene.get_rman_sg_instance(instance, rman_sg_node, instance_parent, psys, create=False)
@@ -1001,7 +1041,7 @@ class RmanSceneSync(object):
                                                                                             
             # delete objects
             if deleted_obj_keys:
-                self.delete_objects(deleted_obj_keys)        
+                self.delete_objects(list(deleted_obj_keys))
                      
     @time_this
     def delete_objects(self, deleted_obj_keys=list()):
@@ -10,6 +10,8 @@ class RmanSgMaterial(RmanSgNode):
         self.sg_stroke_mat = None
         self.sg_fill_mat = None
         self.nodes_to_blnodeinfo = dict()
+        self.shader_cache = dict() # shader handle -> (node signature, sg_node)
+        self.prev_shader_cache = dict() # shader_cache from the previous update
         self.sg_group = rman_scene.sg_scene.CreateGroup("__lightFilterParent") 
         self.sg_lightfilters = list() # list to hold light filter transforms
 
@@ -12,6 +12,16 @@ class RmanSgMesh(RmanSgNode):
         self.subdiv_scheme = 'none'
         self.is_multi_material = False
         self.multi_material_children = []
+
+        # material index for each face, and the face sets built
+        # from them. Used to skip rebuilding the face sets
+        # when the material indices haven't changed
+        self.material_ids = None
+        self.mat_faces = None
+
+        # points for each deformation motion sample, keyed by
+        # sample index. Filled in by RmanMeshTranslator.export_deform_sample
+        self.deform_samples = dict()
         self.sg_mesh = None
 
     def __del__(self):
@@ -130,6 +130,10 @@ class RmanCurveTranslator(RmanMeshTranslator):
         if rman_sg_curve.is_mesh:
             super().export_deform_sample(rman_sg_curve, ob, time_sample, sg_node=rman_sg_curve.sg_mesh_node)
 
+    def flush_deform_samples(self, rman_sg_curve):
+        if rman_sg_curve.is_mesh:
+            super().flush_deform_samples(rman_sg_curve, sg_node=rman_sg_curve.sg_mesh_node)
+
     #def export_object_primvars(self, ob, rman_sg_node):
     #    if rman_sg_node.is_mesh:
     #        super().export_object_primvars(ob, rman_sg_node, sg_node=rman_sg_node.sg_mesh_node)
@@ -4,6 +4,7 @@ from ..rfb_utils import object_utils
 from ..rfb_utils import transform_utils
 from ..rfb_utils import scenegraph_utils
 from ..rfb_utils import particles_utils
+from ..rfb_utils import primvar_utils
 
 import bpy
 import math
@@ -43,9 +44,10 @@ class RmanEmitterTranslator(RmanTranslator):
         inv_mtx = ob.matrix_world.inverted_safe()
         cur_frame = self.rman_scene.bl_scene.frame_current
         do_motion = do_motion = self.rman_scene.do_motion_blur
-        P, next_P, width = particles_utils.get_particles(ob, psys, inv_mtx, cur_frame, get_next_P=do_motion)
+        snapshot = particles_utils.RmanParticleSnapshot(psys, (cur_frame, cur_frame))
+        P, next_P, width = particles_utils.get_particles(ob, psys, inv_mtx, cur_frame, get_next_P=do_motion, get_width=not rm.constant_width, snapshot=snapshot)
 
-        if not P:
+        if len(P) < 1:
             return
 
         rman_sg_emitter.npoints = len(P)
@@ -60,18 +62,18 @@ class RmanEmitterTranslator(RmanTranslator):
             primvar.SetTimes([])            
     
         
-        particles_utils.get_primvars_particle(primvar, cur_frame, psys, [cur_frame], 0)      
+        particles_utils.get_primvars_particle(primvar, cur_frame, psys, [cur_frame], 0, snapshot=snapshot)      
         
         if self.rman_scene.do_motion_blur and rm.do_velocity_blur:
-            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex", 0) 
-            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, next_P, "vertex", 1)  
+            primvar_utils.set_primvar_detail(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex", 0) 
+            primvar_utils.set_primvar_detail(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, next_P, "vertex", 1)  
         else:
-            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")                   
+            primvar_utils.set_primvar_detail(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")                   
         if rm.constant_width:
             width = rm.width
             primvar.SetFloatDetail(self.rman_scene.rman.Tokens.Rix.k_width, width, "constant")
         else:
-            primvar.SetFloatDetail(self.rman_scene.rman.Tokens.Rix.k_width, width, "vertex")                     
+            primvar_utils.set_primvar_detail(primvar, 'SetFloatDetail', self.rman_scene.rman.Tokens.Rix.k_width, width, "vertex")                     
 
         super().export_object_primvars(ob, primvar)
         sg_emitter_node.SetPrimVars(primvar)
@@ -1,25 +1,38 @@
 from .rman_translator import RmanTranslator
 from ..rfb_utils import transform_utils
 from ..rfb_utils import scenegraph_utils
+from ..rfb_utils import hair_utils
+from ..rfb_utils import primvar_utils
 from ..rfb_utils.timer_utils import time_this
 from ..rfb_utils.scene_utils import BlAttribute
 from ..rfb_logger import rfb_log
 from ..rman_sg_nodes.rman_sg_haircurves import RmanSgHairCurves
-from mathutils import Vector
 import math
 import bpy    
 import numpy as np
-from copy import deepcopy
+from copy import copy
+
+# approximate number of bytes per element for each attribute type
+__RMAN_ATTR_BYTES__ = {
+    'float': 4,
+    'integer': 4,
+    'float2': 8,
+    'vector': 12,
+    'color': 12
+}
 
 class BlHair:
 
     def __init__(self):        
-        self.points = []
-        self.vertsArray = []
-        self.nverts = 0
-        self.hair_width = []
-        self.index = []
+        self.points = np.zeros((0, 3), dtype=np.float32)
+        self.vertsArray = np.zeros(0, dtype=np.int32)
+        self.hair_width = np.zeros(0, dtype=np.float32)
+        self.index = np.zeros(0, dtype=np.int32)
         self.bl_hair_attributes = dict()
+
+    @property
+    def nverts(self):
+        return len(self.points)
 class RmanHairCurvesTranslator(RmanTranslator):
 
     def __init__(self, rman_scene):
@@ -48,30 +61,29 @@ class RmanHairCurvesTranslator(RmanTranslator):
                 continue
             primvar = curves_sg.GetPrimVars()
 
-            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, bl_curve.points, "vertex", time_sample)  
+            primvar_utils.set_primvar_detail(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, bl_curve.points, "vertex", time_sample)
             curves_sg.SetPrimVars(primvar)
 
+    @time_this
     def update(self, ob, rman_sg_hair):
         if rman_sg_hair.sg_node:
             if rman_sg_hair.sg_node.GetNumChildren() > 0:
                 self.clear_children(ob, rman_sg_hair)
 
-        curves = self._get_strands_(ob)
-        if not curves:
-            return
-
-        for i, bl_curve in enumerate(curves):
+        # _get_strands_ builds each batch as we ask for it, so commit
+        # each batch to its own curves prim before building the next
+        for i, bl_curve in enumerate(self._get_strands_(ob)):
             curves_sg = self.rman_scene.sg_scene.CreateCurves("%s-%d" % (rman_sg_hair.db_name, i))
             curves_sg.Define(self.rman_scene.rman.Tokens.Rix.k_cubic, "nonperiodic", "catmull-rom", len(bl_curve.vertsArray), len(bl_curve.points))
             primvar = curves_sg.GetPrimVars()                  
-            primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, bl_curve.points, "vertex")
+            primvar_utils.set_primvar_detail(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, bl_curve.points, "vertex")
 
-            primvar.SetIntegerDetail(self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, bl_curve.vertsArray, "uniform")
+            primvar_utils.set_primvar_detail(primvar, 'SetIntegerDetail', self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, bl_curve.vertsArray, "uniform")
             index_nm = 'index'
-            primvar.SetIntegerDetail(index_nm, bl_curve.index, "uniform")
+            primvar_utils.set_primvar_detail(primvar, 'SetIntegerDetail', index_nm, bl_curve.index, "uniform")
 
             width_detail = "vertex" 
-            primvar.SetFloatDetail(self.rman_scene.rman.Tokens.Rix.k_width, bl_curve.hair_width, width_detail)
+            primvar_utils.set_primvar_detail(primvar, 'SetFloatDetail', self.rman_scene.rman.Tokens.Rix.k_width, bl_curve.hair_width, width_detail)
             
             BlAttribute.set_rman_primvars(primvar, bl_curve.bl_hair_attributes)
                     
@@ -81,36 +93,45 @@ class RmanHairCurvesTranslator(RmanTranslator):
         
     def get_attributes(self, ob, bl_hair_attributes):
         detail_map = { len(ob.data.points): 'vertex', len(ob.data.curves): 'uniform'}
-        BlAttribute.parse_attributes(bl_hair_attributes, ob, detail_map)
+        BlAttribute.parse_attributes(bl_hair_attributes, ob, detail_map, as_arrays=True)
         if 'color' in bl_hair_attributes:
             # rename color to Cs
             v = bl_hair_attributes['color']
             v.rman_name = 'Cs'
             bl_hair_attributes['color'] = v
             
-    def get_attributes_for_curves(self, ob, bl_hair_attributes, bl_curve, idx, fp_idx, npoints):
-        uv_map = ob.original.data.surface_uv_map
-        for attr in ob.data.attributes:
-            if attr.name.startswith('.'):
-                continue
-            if attr.name not in bl_hair_attributes:
-                continue
-            hair_attr = bl_hair_attributes[attr.name]
-
-            hair_curve_attr = bl_curve.bl_hair_attributes.get(attr.name, BlAttribute())
-            hair_curve_attr.rman_name = hair_attr.rman_name
-            hair_curve_attr.rman_detail = hair_attr.rman_detail
-            hair_curve_attr.rman_type = hair_attr.rman_type
+    def get_attributes_for_curves(self, bl_hair_attributes, indices, first, last, ncurves, npoints):
+        '''
+        Gather the attributes for a batch of curves. Vertex attributes have their 
+        end points duplicated, like we do for P.
+
+        Arguments:
+        bl_hair_attributes (dict) - dictionary of BlAttributes for the whole object
+        indices (np.ndarray) - gather indices for the batch, from get_end_point_indices
+        first (int) - index of the first curve in the batch
+        last (int) - index of the last curve in the batch + 1
+        ncurves (int) - number of curves
+        npoints (int) - number of points
+
+        Returns:
+        (dict) - dictionary of attribute names to BlAttribute, with the values
+        for the batch
+        '''
+        curve_attributes = dict()
+        for nm, hair_attr in bl_hair_attributes.items():
+            values = np.asarray(hair_attr.values)
             if hair_attr.rman_detail == "uniform":
-                hair_curve_attr.values.append(hair_attr.values[idx])
+                if len(values) != ncurves:
+                    continue
+                values = values[first:last]
+            elif len(values) == npoints:
+                values = values[indices]
             else:
-                # if the detail is vertex, use the first point index
-                # and npoints to get the values we need
-                # we also need to duplicate the end points, like we do for P
-                vals = hair_attr.values[fp_idx:fp_idx+npoints]
-                vals = vals[:1] + vals + vals[-1:]
-                hair_curve_attr.values.append(vals)
-            bl_curve.bl_hair_attributes[attr.name] = hair_curve_attr
+                continue
+            hair_curve_attr = copy(hair_attr)
+            hair_curve_attr.values = values
+            curve_attributes[nm] = hair_curve_attr
+        return curve_attributes
 
     def _copy_uv_map(self, ob, bl_hair_attributes, bl_curve):
         # make a copy of the uv_map to scalpST         
@@ -118,65 +139,70 @@ class RmanHairCurvesTranslator(RmanTranslator):
         hair_attr = bl_hair_attributes.get(uv_map, None)
         hair_curve_attr = bl_curve.bl_hair_attributes.get(uv_map, None)
         if hair_attr and hair_curve_attr and hair_attr.rman_type == 'float2':
-            attr_copy = deepcopy(hair_curve_attr)
+            attr_copy = copy(hair_curve_attr)
             attr_copy.rman_name = 'scalpST'
             bl_curve.bl_hair_attributes['scalpST'] = attr_copy
 
-    @time_this
+    def _get_curve_offsets(self, db):
+        ncurves = len(db.curves)
+        if hasattr(db, 'curve_offset_data'):
+            offsets = np.zeros(ncurves+1, dtype=np.int32)
+            db.curve_offset_data.foreach_get('value', offsets)
+            return offsets[:-1], np.diff(offsets)
+
+        starts = np.zeros(ncurves, dtype=np.int32)
+        lengths = np.zeros(ncurves, dtype=np.int32)
+        db.curves.foreach_get('first_point_index', starts)
+        db.curves.foreach_get('points_length', lengths)
+        return starts, lengths
+
     def _get_strands_(self, ob):
 
-        curve_sets = []
-        bl_curve = BlHair()
         db = ob.data
-        bl_hair_attributes = dict()
-        self.get_attributes(ob, bl_hair_attributes)
-        for curve in db.curves:
-            if curve.points_length < 4:
-                rfb_log().error("We do not support curves with only 4 control points")
-                return []
-
-            npoints = len(curve.points)
-            strand_points = np.zeros(npoints*3, dtype=np.float32)
-            widths = np.zeros(npoints, dtype=np.float32)
-            curve.points.foreach_get('position', strand_points)
-            curve.points.foreach_get('radius', widths)
-            strand_points = np.reshape(strand_points, (npoints, 3))
-            if np.count_nonzero(widths) == 0:
-                # radius is 0. Default to 0.005
-                widths.fill(0.005)
-            widths = widths * 2
-            strand_points = strand_points.tolist()
-            widths = widths.tolist()
-
-            
-            # double the end points
-            strand_points = strand_points[:1] + \
-                strand_points + strand_points[-1:]
+        ncurves = len(db.curves)
+        npoints = len(db.points)
+        if ncurves < 1:
+            return
 
-            widths = widths[:1] + widths + widths[-1:]
-            
-            vertsInStrand = len(strand_points)
-
-            bl_curve.points.extend(strand_points)
-            bl_curve.vertsArray.append(vertsInStrand)
-            bl_curve.hair_width.extend(widths)
-            bl_curve.index.append(curve.index)
-            bl_curve.nverts += vertsInStrand           
-
-            self.get_attributes_for_curves(ob, bl_hair_attributes, bl_curve, curve.index, curve.first_point_index, npoints)
-               
-            # FIXME: is this still needed? 
-            # if we get more than 100000 vertices, start a new BlHair.  This
-            # is to avoid a maxint on the array length        
-            if bl_curve.nverts > 100000:
-                self._copy_uv_map(ob, bl_hair_attributes, bl_curve)
-                curve_sets.append(bl_curve)
-                bl_curve = BlHair()
-            
+        starts, lengths = self._get_curve_offsets(db)
+        if np.any(lengths < 4):
+            rfb_log().error("We do not support curves with only 4 control points")
+            return
 
-        if bl_curve.nverts > 0:
-            self._copy_uv_map(ob, bl_hair_attributes, bl_curve)       
-            curve_sets.append(bl_curve)
+        bl_hair_attributes = dict()
+        self.get_attributes(ob, bl_hair_attributes)
 
-        return curve_sets              
-            
\ No newline at end of file
+        positions = np.zeros(npoints*3, dtype=np.float32)
+        radii = np.zeros(npoints, dtype=np.float32)
+        db.points.foreach_get('position', positions)
+        db.points.foreach_get('radius', radii)
+        positions = np.reshape(positions, (npoints, 3))
+
+        # for curves where the radius is 0, default to 0.005
+        nonzero = np.add.reduceat((radii != 0).astype(np.int32), starts)
+        zero_curves = (nonzero == 0)
+        if np.any(zero_curves):
+            radii[np.repeat(zero_curves, lengths)] = 0.005
+        widths = radii * 2
+
+        # P and width, plus any vertex attributes
+        bytes_per_vert = 16
+        for attr in bl_hair_attributes.values():
+            if attr.rman_detail == 'vertex':
+                bytes_per_vert += __RMAN_ATTR_BYTES__.get(attr.rman_type, 4)
+        max_verts = hair_utils.get_max_batch_verts(bytes_per_vert)
+
+        # split the curves into batches, based on the memory budget.
+        # Each batch is built, and becomes its own BlHair, only when it's
+        # asked for, so only one batch of the expanded arrays is held in 
+        # memory at a time. Each curve gets its end points doubled.
+        for first, last in hair_utils.get_curve_batches(lengths + 2, max_verts):
+            bl_curve = BlHair()
+            indices, verts_array = hair_utils.get_end_point_indices(starts[first:last], lengths[first:last])
+            bl_curve.points = positions[indices]
+            bl_curve.vertsArray = verts_array
+            bl_curve.hair_width = widths[indices]
+            bl_curve.index = np.arange(first, last, dtype=np.int32)
+            bl_curve.bl_hair_attributes = self.get_attributes_for_curves(bl_hair_attributes, indices, first, last, ncurves, npoints)
+            self._copy_uv_map(ob, bl_hair_attributes, bl_curve)
+            yield bl_curve
@@ -1,9 +1,10 @@
 from .rman_translator import RmanTranslator
 from ..rfb_utils import transform_utils
 from ..rfb_utils import scenegraph_utils
+from ..rfb_utils import primvar_utils
+from ..rfb_utils import hair_utils
 from ..rfb_logger import rfb_log
 from ..rman_sg_nodes.rman_sg_hair import RmanSgHair
-from mathutils import Vector
 import math
 import bpy    
 import numpy as np
@@ -11,13 +12,16 @@ import numpy as np
 class BlHair:
 
     def __init__(self):        
-        self.points = []
-        self.next_points = []
-        self.vertsArray = []
-        self.scalpST = []
-        self.mcols = []
-        self.nverts = 0
-        self.hair_width = []
+        self.points = np.zeros((0, 3), dtype=np.float32)
+        self.next_points = np.zeros((0, 3), dtype=np.float32)
+        self.vertsArray = np.zeros(0, dtype=np.int32)
+        self.scalpST = np.zeros((0, 2), dtype=np.float32)
+        self.mcols = np.zeros((0, 3), dtype=np.float32)
+        self.hair_width = np.zeros(0, dtype=np.float32)
+
+    @property
+    def nverts(self):
+        return len(self.points)
 
     @property
     def constant_width(self):
@@ -65,12 +69,10 @@ class RmanHairTranslator(RmanTranslator):
             if rman_sg_hair.sg_node.GetNumChildren() > 0:
                 self.clear_children(ob, psys, rman_sg_hair)
 
-        curves = self._get_strands_(ob, psys)
-        if not curves:
-            return
-
+        # _get_strands_ builds each batch as we ask for it, so commit
+        # each batch to its own curves prim before building the next
         ob_inv_mtx = transform_utils.convert_matrix(ob.matrix_world.inverted_safe())
-        for i, bl_curve in enumerate(curves):
+        for i, bl_curve in enumerate(self._get_strands_(ob, psys)):
             curves_sg = self.rman_scene.sg_scene.CreateCurves("%s-%d" % (rman_sg_hair.db_name, i))
             curves_sg.SetTransform(ob_inv_mtx) # puts points in object space
             curves_sg.Define(self.rman_scene.rman.Tokens.Rix.k_cubic, "nonperiodic", "catmull-rom", len(bl_curve.vertsArray), len(bl_curve.points))
@@ -81,32 +83,35 @@ class RmanHairTranslator(RmanTranslator):
                 primvar.SetTimes([])
 
             if self.rman_scene.do_motion_blur and psys.settings.renderman.do_velocity_blur:
-                primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, bl_curve.points, "vertex", 0)
-                primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, bl_curve.next_points, "vertex", 1)
+                primvar_utils.set_primvar_detail(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, bl_curve.points, "vertex", 0)
+                primvar_utils.set_primvar_detail(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, bl_curve.next_points, "vertex", 1)
             else:
-                primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, bl_curve.points, "vertex")
+                primvar_utils.set_primvar_detail(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, bl_curve.points, "vertex")
 
-            primvar.SetIntegerDetail(self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, bl_curve.vertsArray, "uniform")
+            primvar_utils.set_primvar_detail(primvar, 'SetIntegerDetail', self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, bl_curve.vertsArray, "uniform")
             index_nm = psys.settings.renderman.hair_index_name
             if index_nm == '':
                 index_nm = 'index'
-            primvar.SetIntegerDetail(index_nm, range(len(bl_curve.vertsArray)), "uniform")
+            primvar_utils.set_primvar_detail(primvar, 'SetIntegerDetail', index_nm, np.arange(len(bl_curve.vertsArray), dtype=np.int32), "uniform")
 
             width_detail = "vertex"
             if bl_curve.constant_width:
                 width_detail = "constant" 
-            primvar.SetFloatDetail(self.rman_scene.rman.Tokens.Rix.k_width, bl_curve.hair_width, width_detail)
+            primvar_utils.set_primvar_detail(primvar, 'SetFloatDetail', self.rman_scene.rman.Tokens.Rix.k_width, bl_curve.hair_width, width_detail)
             
             if len(bl_curve.scalpST):
-                primvar.SetFloatArrayDetail("scalpST", bl_curve.scalpST, 2, "uniform")
+                primvar_utils.set_primvar_detail(primvar, 'SetFloatArrayDetail', "scalpST", bl_curve.scalpST, 2, "uniform")
 
             if len(bl_curve.mcols):
-                primvar.SetColorDetail("Cs", bl_curve.mcols, "uniform")
+                primvar_utils.set_primvar_detail(primvar, 'SetColorDetail', "Cs", bl_curve.mcols, "uniform")
                     
             curves_sg.SetPrimVars(primvar)
             rman_sg_hair.sg_node.AddChild(curves_sg)  
             rman_sg_hair.sg_curves_list.append(curves_sg)
 
+        if not rman_sg_hair.sg_curves_list:
+            return
+
         # Attach material
         mat_idx = psys.settings.material - 1
         if mat_idx < len(ob.material_slots):
@@ -133,10 +138,10 @@ class RmanHairTranslator(RmanTranslator):
 
         if self.rman_scene.is_interactive:
             if psys_modifier and not psys_modifier.show_viewport:
-                return None
+                return
         else:
             if psys_modifier and not psys_modifier.show_render:
-                return None             
+                return             
 
         tip_width = psys.settings.tip_radius * psys.settings.radius_scale
         base_width = psys.settings.root_radius * psys.settings.radius_scale
@@ -170,81 +175,101 @@ class RmanHairTranslator(RmanTranslator):
                     mcol_set = i
                     break            
 
-        curve_sets = []
-        bl_curve = BlHair()
-        if conwidth:
-            bl_curve.hair_width.append(base_width)
-        
         start_idx = 0
         if psys.settings.child_type != 'NONE' and num_children > 0:
             start_idx = num_parents
-        
-        for pindex in range(start_idx, total_hair_count):
-            particle = psys.particles[
-                (pindex - num_parents) % num_parents]           
-            strand_points = []
-            next_strand_points = []
-            # walk through each strand
-            for step in range(0, steps):           
-                pt = psys.co_hair(ob, particle_no=pindex, step=step)
-
-                if pt.length_squared == 0:
-                    # this strand ends prematurely                    
-                    break                
-
-                strand_points.append(pt)
-
-            if len(strand_points) < 2:
-                # not enought points
+        nstrands = total_hair_count - start_idx
+        if nstrands < 1 or num_parents < 1:
+            return
+
+        velocities = None
+        if self.rman_scene.do_motion_blur:
+            # used to calculate the points for the next frame
+            nparticles = len(psys.particles)
+            vel = np.zeros(nparticles*3, dtype=np.float32)
+            lifetimes = np.zeros(nparticles, dtype=np.float32)
+            psys.particles.foreach_get('velocity', vel)
+            psys.particles.foreach_get('lifetime', lifetimes)
+            velocities = np.reshape(vel, (nparticles, 3)) / lifetimes[:, np.newaxis]
+
+        # split the strands into batches, based on the memory budget. 
+        # Each batch is built, and becomes its own BlHair, only when it's 
+        # asked for, so only one batch is held in memory at a time. Each strand 
+        # has at most steps+2 vertices.
+        bytes_per_vert = np.dtype(np.float32).itemsize * 3
+        if velocities is not None:
+            bytes_per_vert += np.dtype(np.float32).itemsize * 3
+        if not conwidth:
+            bytes_per_vert += np.dtype(np.float32).itemsize
+        max_verts = hair_utils.get_max_batch_verts(bytes_per_vert)
+        batch_strands = max(max_verts // (steps + 2), 1)
+
+        co_hair = psys.co_hair
+        for batch_start in range(start_idx, total_hair_count, batch_strands):
+            batch_end = min(batch_start + batch_strands, total_hair_count)
+            nbatch = batch_end - batch_start
+
+            # index of the parent particle for each strand
+            particle_indices = (np.arange(batch_start, batch_end) - num_parents) % num_parents
+
+            # co_hair is the only way to get the evaluated strand points (including children),
+            # so we still need to call it for every point. Fill one buffer for all strands
+            # in the batch, and do everything else with array ops.
+            strand_points = np.zeros((nbatch, steps, 3), dtype=np.float32)
+            strand_lengths = np.zeros(nbatch, dtype=np.int64)
+            for i in range(nbatch):
+                pindex = batch_start + i
+                strand = strand_points[i]
+                n = 0
+                # walk through each strand
+                for step in range(0, steps):           
+                    pt = co_hair(ob, particle_no=pindex, step=step)
+
+                    if pt.length_squared == 0:
+                        # this strand ends prematurely                    
+                        break                
+
+                    strand[n] = pt
+                    n += 1
+                strand_lengths[i] = n
+
+            # we need at least 2 points, which after doubling the
+            # end points gives us the 4 vertices catmull-rom requires
+            valid = np.flatnonzero(strand_lengths >= 2)
+            if len(valid) == 0:
                 continue
+            strand_lengths = strand_lengths[valid]
+            particle_indices = particle_indices[valid]
+
+            bl_curve = BlHair()
 
             # double the first and last
-            strand_points = strand_points[:1] + \
-                strand_points + strand_points[-1:]
-                
-            vertsInStrand = len(strand_points)
+            indices, verts_array = hair_utils.get_end_point_indices(valid * steps, strand_lengths)
+            bl_curve.vertsArray = verts_array
+            bl_curve.points = strand_points.reshape(-1, 3)[indices]
+            del strand_points
 
-            # catmull-rom requires at least 4 vertices
-            if vertsInStrand < 4:
-                continue
+            if velocities is not None:
+                bl_curve.next_points = bl_curve.points + np.repeat(velocities[particle_indices], verts_array, axis=0)
 
-            if self.rman_scene.do_motion_blur:
-                # calculate the points for the next frame using velocity
-                vel = Vector(particle.velocity / particle.lifetime )
-                next_strand_points = [p + vel for p in strand_points]
-
-            # for varying width make the width array
-            if not conwidth:
-                decr = (base_width - tip_width) / (vertsInStrand - 2)
-                bl_curve.hair_width.extend([base_width] + [(base_width - decr * i)
-                                                for i in range(vertsInStrand - 2)] +
-                                [tip_width])
-
-            bl_curve.points.extend(strand_points)
-            bl_curve.next_points.extend(next_strand_points)
-            bl_curve.vertsArray.append(vertsInStrand)
-            bl_curve.nverts += vertsInStrand
-               
-            # get the scalp ST
-            if export_st:
-                st = psys.uv_on_emitter(psys_modifier, particle=particle, particle_no=pindex, uv_no=uv_set)
-                bl_curve.scalpST.append(st)
-
-            # get mcol
-            if export_mcol:                 
-                mcol = psys.mcol_on_emitter(psys_modifier, particle=particle, particle_no=pindex, vcol_no=mcol_set)
-                bl_curve.mcols.append(mcol)
-
-            # if we get more than 100000 vertices, start a new BlHair.  This
-            # is to avoid a maxint on the array length
-            if bl_curve.nverts > 100000:
-                curve_sets.append(bl_curve)
-                bl_curve = BlHair()
-                if conwidth:
-                    bl_curve.hair_width.append(base_width)                
-
-        if bl_curve.nverts > 0:       
-            curve_sets.append(bl_curve)
-
-        return curve_sets              
-            
\ No newline at end of file
+            if conwidth:
+                bl_curve.hair_width = np.array([base_width], dtype=np.float32)
+            else:
+                # for varying width make the width array
+                bl_curve.hair_width = hair_utils.get_tapered_widths(verts_array, base_width, tip_width)
+
+            # get the scalp ST and mcol
+            if export_st or export_mcol:
+                scalpST = np.zeros((len(valid) if export_st else 0, 2), dtype=np.float32)
+                mcols = np.zeros((len(valid) if export_mcol else 0, 3), dtype=np.float32)
+                for i, (sindex, pidx) in enumerate(zip(valid.tolist(), particle_indices.tolist())):
+                    particle = psys.particles[pidx]
+                    pindex = batch_start + sindex
+                    if export_st:
+                        scalpST[i] = psys.uv_on_emitter(psys_modifier, particle=particle, particle_no=pindex, uv_no=uv_set)
+                    if export_mcol:
+                        mcols[i] = psys.mcol_on_emitter(psys_modifier, particle=particle, particle_no=pindex, vcol_no=mcol_set)
+                bl_curve.scalpST = scalpST
+                bl_curve.mcols = mcols
+
+            yield bl_curve
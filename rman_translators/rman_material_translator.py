@@ -66,10 +66,16 @@ class RmanMaterialTranslator(RmanTranslator):
         rman_sg_material.sg_node.SetLight(None)
         rman_sg_material.sg_node.SetDisplace(None)        
 
+        # shader nodes from the previous update. These get reused
+        # if their signature hasn't changed.
+        rman_sg_material.prev_shader_cache = rman_sg_material.shader_cache
+        rman_sg_material.shader_cache = dict()
+
         handle = string_utils.sanitize_node_name(rman_sg_material.db_name)
         if mat.grease_pencil:
             if not mat.node_tree or not shadergraph_utils.is_renderman_nodetree(mat):
                 self.export_shader_grease_pencil(mat, rman_sg_material, handle=handle)
+                rman_sg_material.prev_shader_cache = dict()
                 return
 
         if mat.node_tree:
@@ -78,6 +84,8 @@ class RmanMaterialTranslator(RmanTranslator):
         if not succeed:
             succeed = self.export_simple_shader(mat, rman_sg_material, mat_handle=handle)     
 
+        rman_sg_material.prev_shader_cache = dict()
+
     def export_shader_grease_pencil(self, mat, rman_sg_material, handle):
         gp_mat = mat.grease_pencil
         rman_sg_material.is_gp_material = True
@@ -157,7 +165,7 @@ class RmanMaterialTranslator(RmanTranslator):
                                     bxdfList.append(s) 
 
                             for node, bl_node_info in rman_sg_material.nodes_to_blnodeinfo.items():
-                                if bl_node_info.is_cycles_node:
+                                if bl_node_info.is_cycles_node or bl_node_info.is_cached:
                                     continue
                                 property_utils.property_group_to_rixparams(node, rman_sg_material, bl_node_info.sg_node, ob=material, group_node=bl_node_info.group_node)
                             
@@ -187,7 +195,7 @@ class RmanMaterialTranslator(RmanTranslator):
                                 for s in shader_sg_nodes:
                                     lightNodesList.append(s) 
                             for node, bl_node_info in rman_sg_material.nodes_to_blnodeinfo.items():
-                                if bl_node_info.is_cycles_node:
+                                if bl_node_info.is_cycles_node or bl_node_info.is_cached:
                                     continue                            
                                 property_utils.property_group_to_rixparams(node, rman_sg_material, bl_node_info.sg_node, ob=material, group_node=bl_node_info.group_node)
                                                         
@@ -212,7 +220,7 @@ class RmanMaterialTranslator(RmanTranslator):
                             for s in shader_sg_nodes:
                                 dispList.append(s) 
                         for node, bl_node_info in rman_sg_material.nodes_to_blnodeinfo.items():
-                            if bl_node_info.is_cycles_node:
+                            if bl_node_info.is_cycles_node or bl_node_info.is_cached:
                                 continue
                             property_utils.property_group_to_rixparams(node, rman_sg_material, bl_node_info.sg_node, ob=material, group_node=bl_node_info.group_node)
                                                                               
@@ -244,6 +252,8 @@ class RmanMaterialTranslator(RmanTranslator):
                     bxdfList.append(s)                     
 
             for node, bl_node_info in rman_sg_material.nodes_to_blnodeinfo.items():
+                if bl_node_info.is_cached:
+                    continue
                 property_utils.property_group_to_rixparams(node, rman_sg_material, bl_node_info.sg_node, ob=mat, group_node=bl_node_info.group_node)
 
         bxdfList.append(rman_solo_sg_node)
@@ -484,6 +494,17 @@ class RmanMaterialTranslator(RmanTranslator):
         if not hasattr(node, 'renderman_node_type'):
             return list()
 
+        node_signature = None
+        if node.renderman_node_type != "light":
+            # see if we can reuse the shader node from the previous update
+            node_signature = property_utils.get_node_signature(node, rman_sg_material, group_node=group_node)
+            if node_signature is not None:
+                sig, sg_node = rman_sg_material.prev_shader_cache.get(instance, (None, None))
+                if sig == node_signature:
+                    rman_sg_material.shader_cache[instance] = (node_signature, sg_node)
+                    rman_sg_material.nodes_to_blnodeinfo[node] = shadergraph_utils.BlNodeInfo(sg_node, group_node=group_node, is_cached=True)
+                    return [sg_node]
+
         if node.renderman_node_type == "pattern":
             if node.bl_label == 'PxrOSL':
                 shader = node.shadercode 
@@ -516,6 +537,8 @@ class RmanMaterialTranslator(RmanTranslator):
         else:
             sg_node = self.rman_scene.rman.SGManager.RixSGShader("Bxdf", node.bl_label, instance)        
 
+        if node_signature is not None and sg_node:
+            rman_sg_material.shader_cache[instance] = (node_signature, sg_node)
         rman_sg_material.nodes_to_blnodeinfo[node] = shadergraph_utils.BlNodeInfo(sg_node, group_node=group_node)
         return [sg_node]       
 
@@ -5,6 +5,7 @@ from ..rfb_utils import mesh_utils
 from ..rfb_utils import string_utils
 from ..rfb_utils import property_utils
 from ..rfb_utils import scenegraph_utils
+from ..rfb_utils import primvar_utils
 from ..rfb_utils.scene_utils import BlAttribute
 from ..rfb_logger import rfb_log
 from ..rman_constants import BLENDER_41
@@ -14,25 +15,10 @@ import math
 import bmesh
 import numpy as np
 
-def _get_mats_faces_(nverts, material_ids):
-
-    mats = {}
-    for face_id, num_verts in enumerate(nverts):
-        mat_id = material_ids[face_id]
-        if mat_id not in mats:
-            mats[mat_id] = []
-        mats[mat_id].append(face_id)
-    return mats
-
-def _is_multi_material_(ob, mesh):
-    if len(ob.data.materials) < 2 or len(mesh.polygons) == 0:
+def _is_multi_material_(ob, payload):
+    if len(ob.data.materials) < 2 or not payload.mat_faces:
         return False
-
-    first_mat = mesh.polygons[0].material_index
-    for p in mesh.polygons:
-        if p.material_index != first_mat:
-            return True
-    return False
+    return len(payload.mat_faces) > 1
 
 # requires facevertex interpolation
 def _get_mesh_uv_(mesh, name="", ob=None):
@@ -61,13 +47,12 @@ def _get_mesh_uv_(mesh, name="", ob=None):
         return None
 
     uv_count = len(uv_loop_layer.data)
-    fastuvs = np.zeros(uv_count * 2)
+    fastuvs = np.zeros(uv_count * 2, dtype=np.float32)
     uv_loop_layer.data.foreach_get(data, fastuvs)   
-    uvs = fastuvs.tolist()
 
-    return uvs
+    return fastuvs
 
-def _get_mesh_vcol_(mesh, name="", ob=None):    
+def _get_mesh_vcol_(mesh, name="", ob=None, drop_alpha=True):    
     if not name:
         vcol_layer = mesh.vertex_colors.active
         if ob and not vcol_layer:
@@ -88,12 +73,14 @@ def _get_mesh_vcol_(mesh, name="", ob=None):
         return None
 
     vcol_count = len(vcol_layer.data)
-    fastvcols = np.zeros(vcol_count * 4)
+    fastvcols = np.zeros(vcol_count * 4, dtype=np.float32)
     vcol_layer.data.foreach_get("color", fastvcols)
     fastvcols = np.reshape(fastvcols, (vcol_count, 4))
-    pre_cols = fastvcols.tolist()     
+    if not drop_alpha:
+        return fastvcols
     
-    cols = [ [c[0], c[1], c[2]] for c in pre_cols ]
+    # drop the alpha channel
+    cols = np.ascontiguousarray(fastvcols[:, 0:3])
 
     return cols    
 
@@ -108,36 +95,26 @@ def _get_mesh_vattr_(mesh, name=""):
         return None
 
     vcol_count = len(vattr_layer.data)
-    fastvattrs = np.zeros(vcol_count * 4)
+    fastvattrs = np.zeros(vcol_count * 4, dtype=np.float32)
     vattr_layer.data.foreach_get("color", fastvattrs)
     fastvattrs = np.reshape(fastvattrs, (vcol_count, 4))
-    pre_cols = fastvattrs.tolist()     
     
-    attrs = [ [a[0], a[1], a[2]] for a in pre_cols ]
+    attrs = np.ascontiguousarray(fastvattrs[:, 0:3])
 
     return attrs 
 
-def _get_mesh_vgroup_(ob, mesh, name=""):
+def _get_mesh_vgroup_(ob, vgroup_weights, name=""):
     vgroup = ob.vertex_groups[name] if name != "" else ob.vertex_groups.active
-    weights = []
 
     if vgroup is None:
         return None
 
-    for v in mesh.vertices:
-        if len(v.groups) == 0:
-            weights.append(0.0)
-        else:
-            weights.extend([g.weight if g.group == vgroup.index else 0.0 for g in v.groups
-                            ])
-
-    return weights
+    return vgroup_weights.get_weights(vgroup.index)
 
 def _get_material_ids(ob, geo):        
     fast_material_ids = np.zeros(len(geo.polygons), dtype=np.int32)
     geo.polygons.foreach_get("material_index", fast_material_ids)
-    material_ids = fast_material_ids.tolist()
-    return material_ids
+    return fast_material_ids
 
 def _export_reference_pose(ob, rman_sg_mesh, rm, rixparams):
     rman__Pref = []
@@ -221,7 +198,16 @@ def export_tangents(ob, geo, rixparams, uvmap="", name=""):
     except RuntimeError as err:
         rfb_log().debug("Can't export tangent vectors: %s" % str(err))       
 
-def _get_primvars_(ob, rman_sg_mesh, geo, rixparams):
+def _needs_mesh_for_primvars_(rm):
+    # whether _get_primvars_ needs to read from the Blender mesh
+    # for anything that's not already in the RmanMeshPayload
+    if rm.export_default_uv and rm.export_default_tangents:
+        return True
+    if getattr(rm, 'output_all_primvars', False):
+        return True
+    return len(rm.prim_vars) > 0
+
+def _get_primvars_(ob, rman_sg_mesh, geo, rixparams, payload):
     #rm = ob.data.renderman
     # Stange problem here : ob seems to not be in sync with the scene
     # when a geometry node is active...
@@ -229,19 +215,13 @@ def _get_primvars_(ob, rman_sg_mesh, geo, rixparams):
 
     facevarying_detail = rman_sg_mesh.nverts 
 
-    if rm.export_default_uv:
-        uvs = _get_mesh_uv_(geo, ob=ob)
-        if uvs and len(uvs) > 0:
-            detail = "facevarying" if (facevarying_detail*2) == len(uvs) else "vertex"
-            rixparams.SetFloatArrayDetail("st", uvs, 2, detail)
-            if rm.export_default_tangents:
-                export_tangents(ob, geo, rixparams)    
+    if rm.export_default_uv and payload.st_detail:
+        primvar_utils.set_primvar_detail(rixparams, 'SetFloatArrayDetail', "st", payload.st, 2, payload.st_detail)
+        if rm.export_default_tangents:
+            export_tangents(ob, geo, rixparams)    
 
-    if rm.export_default_vcol:
-        vcols = _get_mesh_vcol_(geo, ob=ob)
-        if vcols and len(vcols) > 0:
-            detail = "facevarying" if facevarying_detail == len(vcols) else "vertex"
-            rixparams.SetColorDetail("Cs", vcols, detail)
+    if rm.export_default_vcol and payload.Cs_detail:
+        primvar_utils.set_primvar_detail(rixparams, 'SetColorDetail', "Cs", payload.Cs, payload.Cs_detail)
 
     # reference pose
     if hasattr(rm, 'reference_pose'):
@@ -257,40 +237,45 @@ def _get_primvars_(ob, rman_sg_mesh, geo, rixparams):
         BlAttribute.set_rman_primvars(rixparams, attrs_dict)
 
         # vertex group
-        for nm in ob.vertex_groups.keys():
-            weights = _get_mesh_vgroup_(ob, geo, nm)
-            if weights and len(weights) > 0:
-                detail = "facevarying" if facevarying_detail == len(weights) else "vertex"
-                rixparams.SetFloatDetail(nm, weights, detail)        
+        if len(ob.vertex_groups) > 0:
+            vgroup_weights = mesh_utils.RmanVertexGroupWeights(geo)
+            for nm in ob.vertex_groups.keys():
+                weights = _get_mesh_vgroup_(ob, vgroup_weights, nm)
+                if weights is not None and len(weights) > 0:
+                    detail = "facevarying" if facevarying_detail == len(weights) else "vertex"
+                    primvar_utils.set_primvar_detail(rixparams, 'SetFloatDetail', nm, weights, detail)
         
     else:
         # custom prim vars
+        vgroup_weights = None
         for p in rm.prim_vars:
             if p.data_source == 'VERTEX_COLOR':
                 vcols = _get_mesh_vcol_(geo, p.data_name)
                 
-                if vcols and len(vcols) > 0:
+                if vcols is not None and len(vcols) > 0:
                     detail = "facevarying" if facevarying_detail == len(vcols) else "vertex"
-                    rixparams.SetColorDetail(p.name, vcols, detail)
+                    primvar_utils.set_primvar_detail(rixparams, 'SetColorDetail', p.name, vcols, detail)
                 
             elif p.data_source == 'UV_TEXTURE':
                 uvs = _get_mesh_uv_(geo, p.data_name)
-                if uvs and len(uvs) > 0:
+                if uvs is not None and len(uvs) > 0:
                     detail = "facevarying" if (facevarying_detail*2) == len(uvs) else "vertex"
-                    rixparams.SetFloatArrayDetail(p.name, uvs, 2, detail)
+                    primvar_utils.set_primvar_detail(rixparams, 'SetFloatArrayDetail', p.name, uvs, 2, detail)
                     if p.export_tangents:
                         export_tangents(ob, geo, rixparams, uvmap=p.data_name, name=p.name) 
 
             elif p.data_source == 'VERTEX_GROUP':
-                weights = _get_mesh_vgroup_(ob, geo, p.data_name)
-                if weights and len(weights) > 0:
+                if vgroup_weights is None:
+                    vgroup_weights = mesh_utils.RmanVertexGroupWeights(geo)
+                weights = _get_mesh_vgroup_(ob, vgroup_weights, p.data_name)
+                if weights is not None and len(weights) > 0:
                     detail = "facevarying" if facevarying_detail == len(weights) else "vertex"
-                    rixparams.SetFloatDetail(p.name, weights, detail)
+                    primvar_utils.set_primvar_detail(rixparams, 'SetFloatDetail', p.name, weights, detail)
             elif p.data_source == 'VERTEX_ATTR_COLOR':
                 vattr = _get_mesh_vattr_(geo, p.data_name)            
-                if vattr and len(vattr) > 0:
+                if vattr is not None and len(vattr) > 0:
                     detail = "facevarying" if facevarying_detail == len(vattr) else "vertex"
-                    rixparams.SetColorDetail(p.data_name, vattr, detail)
+                    primvar_utils.set_primvar_detail(rixparams, 'SetColorDetail', p.data_name, vattr, detail)
 
     rm_scene = rman_sg_mesh.rman_scene.bl_scene.renderman
     property_utils.set_primvar_bl_props(rixparams, rm, inherit_node=rm_scene)
@@ -301,43 +286,8 @@ class RmanMeshTranslator(RmanTranslator):
         super().__init__(rman_scene)
         self.bl_type = 'MESH' 
 
-    def _get_subd_tags_(self, ob, mesh, primvar):
-        rm = mesh.renderman
-
-        tags = ['interpolateboundary', 'facevaryinginterpolateboundary']
-        nargs = [1, 0, 0, 1, 0, 0]
-        intargs = [ int(ob.data.renderman.rman_subdivInterp),
-                int(ob.data.renderman.rman_subdivFacevaryingInterp)]
-        floatargs = []
-        stringargs = []   
-
-        # get creases
-        edges_len = len(mesh.edges)
-        creases = np.zeros(edges_len, dtype=np.float32)
-        if BLENDER_41:
-            if mesh.edge_creases:
-                mesh.edge_creases.data.foreach_get('value', creases)
-        else:
-            mesh.edges.foreach_get('crease', creases)
-        if (creases > 0.0).any():
-            # we have edges where their crease is > 0.0
-            # grab only those edges
-            crease_edges = np.zeros(edges_len*2, dtype=np.int32)
-            mesh.edges.foreach_get('vertices', crease_edges)
-            crease_edges = np.reshape(crease_edges, (edges_len, 2))
-            crease_edges = crease_edges[creases > 0.0]
-            
-            # squared, to match blender appareance better
-            #: range 0 - 10 (infinitely sharp)
-            creases = creases * creases * 10.0
-            
-            creases = creases[creases > 0.0]
-            edges_subset_len = len(creases) 
-
-            tags.extend(['crease'] * edges_subset_len)
-            nargs.extend([2, 1, 0] * edges_subset_len)
-            intargs.extend(crease_edges.flatten().tolist())
-            floatargs.extend(creases.tolist())   
+    def _get_subd_tags_(self, payload, primvar):
+        tags, nargs, intargs, floatargs, stringargs = payload.subd_tags
 
         '''
         # Blender 4.0 removed face maps, also adding holes
@@ -373,6 +323,66 @@ class RmanMeshTranslator(RmanTranslator):
         primvar.SetFloatArray(self.rman_scene.rman.Tokens.Rix.k_Ri_subdivtagfloatargs, floatargs, len(floatargs))
         primvar.SetStringArray(self.rman_scene.rman.Tokens.Rix.k_Ri_subdivtagstringtags, stringargs, len(stringargs))        
 
+    def gather_payload(self, ob, mesh):
+        '''
+        Read all of the buffers we need from the Blender mesh into a RmanMeshPayload. 
+        This needs to be called from the main thread. The returned payload still needs to 
+        be processed (RmanMeshPayload.process), which can be done on a worker thread.
+
+        Arguments:
+        ob (bpy.types.Object) - the evaluated Blender object
+        mesh (bpy.types.Mesh) - the mesh to read from
+
+        Returns:
+        (RmanMeshPayload) - the payload
+        '''
+        rm = ob.original.data.renderman
+        payload = mesh_utils.RmanMeshPayload()
+        payload.is_subdiv = object_utils.is_subdmesh(ob.original)
+        payload.use_subdiv_modifier = (payload.is_subdiv and rm.rman_subdiv_scheme == "none")
+        use_smooth_normals = getattr(rm, 'rman_smoothnormals', False)
+        get_normals = (payload.is_subdiv == 0 and not use_smooth_normals)
+        if payload.use_subdiv_modifier:
+            # always get the normals when we're using the subdiv modifier
+            get_normals = True
+        rman_mesh = mesh_utils.get_mesh(mesh, get_normals=get_normals, as_arrays=True)
+        payload.nverts = rman_mesh.nverts
+        payload.verts = rman_mesh.verts
+        payload.P = rman_mesh.P
+        payload.N = rman_mesh.N
+
+        if len(payload.nverts) == 0:
+            return payload
+
+        if rm.export_default_uv:
+            payload.st = _get_mesh_uv_(mesh, ob=ob)
+        if rm.export_default_vcol:
+            # the alpha channel is dropped in RmanMeshPayload.process
+            payload.Cs = _get_mesh_vcol_(mesh, ob=ob, drop_alpha=False)
+
+        if len(ob.data.materials) > 1:
+            payload.material_ids = _get_material_ids(ob, mesh)
+
+        if payload.is_subdiv:
+            payload.subdiv_interp = int(rm.rman_subdivInterp)
+            payload.subdiv_fvar_interp = int(rm.rman_subdivFacevaryingInterp)
+
+            # get creases
+            edges_len = len(mesh.edges)
+            creases = np.zeros(edges_len, dtype=np.float32)
+            if BLENDER_41:
+                if mesh.edge_creases:
+                    mesh.edge_creases.data.foreach_get('value', creases)
+            else:
+                mesh.edges.foreach_get('crease', creases)
+            payload.creases = creases
+            if (creases > 0.0).any():
+                edge_verts = np.zeros(edges_len*2, dtype=np.int32)
+                mesh.edges.foreach_get('vertices', edge_verts)
+                payload.edge_verts = np.reshape(edge_verts, (edges_len, 2))
+
+        return payload
+
     def export(self, ob, db_name):
         
         sg_node = self.rman_scene.sg_scene.CreateGroup('')
@@ -386,17 +396,46 @@ class RmanMeshTranslator(RmanTranslator):
 
         return rman_sg_mesh
 
+    def _set_deform_samples(self, rman_sg_mesh, sg_node, samples):
+        # set all of the deformation samples on sg_node, and any
+        # multi-material children. If all of the samples are the same, 
+        # the mesh is not deforming during this shutter interval, so drop 
+        # the time samples and export it as static. This is only for this 
+        # export; is_deforming is left alone, as the mesh could still deform 
+        # on another frame.
+        P = samples[0]
+        is_static = all(np.array_equal(P, samples[i]) for i in range(1, len(samples)))
+
+        nodes = [sg_node]
+        if rman_sg_mesh.is_multi_material:
+            nodes.extend(rman_sg_mesh.multi_material_children)
+
+        for node in nodes:
+            primvar = node.GetPrimVars()
+            if is_static:
+                primvar.SetTimes([])
+                primvar_utils.set_primvar_detail(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")
+            else:
+                for time_sample, samp_P in enumerate(samples):
+                    primvar_utils.set_primvar_detail(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, samp_P, "vertex", time_sample)
+            node.SetPrimVars(primvar)
+
     def export_deform_sample(self, rman_sg_mesh, ob, time_sample, sg_node=None):
+        # The points for each sample are held until we have all of them. They are then 
+        # set in one go, so that each scene graph node is only edited once, and meshes 
+        # that don't actually move during the shutter interval are exported without 
+        # time samples.
 
-        mesh = None
         mesh = ob.to_mesh()
         if not sg_node:
             sg_node = rman_sg_mesh.sg_mesh
-        primvar = sg_node.GetPrimVars()
-        P = mesh_utils.get_mesh_points_(mesh)
+        P = mesh_utils.get_mesh_points_(mesh, as_array=True)
+        ob.to_mesh_clear()
         npoints = len(P)
 
         if rman_sg_mesh.npoints != npoints:
+            rman_sg_mesh.deform_samples.clear()
+            primvar = sg_node.GetPrimVars()
             primvar.SetTimes([])
             sg_node.SetPrimVars(primvar)
             rman_sg_mesh.is_transforming = False
@@ -408,17 +447,42 @@ class RmanMeshTranslator(RmanTranslator):
                     c.SetPrimVars(pvar)            
             return       
 
-        primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex", time_sample)                            
+        rman_sg_mesh.deform_samples[time_sample] = P
+        num_samples = len(rman_sg_mesh.deform_motion_steps)
+        if len(rman_sg_mesh.deform_samples) < num_samples:
+            return
 
-        sg_node.SetPrimVars(primvar)
+        samples = [rman_sg_mesh.deform_samples[i] for i in range(num_samples)]
+        rman_sg_mesh.deform_samples.clear()
+        self._set_deform_samples(rman_sg_mesh, sg_node, samples)
 
-        if rman_sg_mesh.is_multi_material:
-            for c in rman_sg_mesh.multi_material_children:
-                pvar = c.GetPrimVars()
-                pvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex", time_sample)                                  
-                c.SetPrimVars(pvar)
+    def flush_deform_samples(self, rman_sg_mesh, sg_node=None):
+        '''
+        Set any deformation samples that export_deform_sample is still holding.
+        This happens when the mesh was not found for every time sample (ex: its 
+        instance was not in the depsgraph for one of the samples). Each missing 
+        sample is filled in with the closest earlier sample we have (or the first 
+        sample we have, if there isn't one).
+
+        Arguments:
+        rman_sg_mesh (RmanSgMesh) - the mesh
+        sg_node (RixSGMesh) - the scene graph node to set the samples on. Defaults to rman_sg_mesh.sg_mesh
+        '''
+        if not rman_sg_mesh.deform_samples:
+            return
+        if not sg_node:
+            sg_node = rman_sg_mesh.sg_mesh
 
-        ob.to_mesh_clear()    
+        num_samples = len(rman_sg_mesh.deform_motion_steps)
+        samples = []
+        P = None
+        for i in range(num_samples):
+            P = rman_sg_mesh.deform_samples.get(i, P)
+            samples.append(P)
+        first_P = next(P for P in samples if P is not None)
+        samples = [first_P if P is None else P for P in samples]
+        rman_sg_mesh.deform_samples.clear()
+        self._set_deform_samples(rman_sg_mesh, sg_node, samples)
 
     def update_primvar(self, ob, rman_sg_mesh, prop_name):
         mesh = ob.to_mesh()
@@ -433,33 +497,41 @@ class RmanMeshTranslator(RmanTranslator):
         rman_sg_mesh.sg_mesh.SetPrimVars(primvars)
         ob.to_mesh_clear()
 
-    def update(self, ob, rman_sg_mesh, input_mesh=None, sg_node=None):
+    def update(self, ob, rman_sg_mesh, input_mesh=None, sg_node=None, payload=None):
         rm = ob.original.data.renderman
         mesh = input_mesh
-        if not mesh:
+        clear_mesh = False
+        if not mesh and (payload is None or _needs_mesh_for_primvars_(rm)):
             mesh = ob.to_mesh()
             if not mesh:
                 return True
+            clear_mesh = True
 
         if not sg_node:
             sg_node = rman_sg_mesh.sg_mesh
 
-        rman_sg_mesh.is_subdiv = object_utils.is_subdmesh(ob.original)
-        use_subdiv_modifer = (rman_sg_mesh.is_subdiv and rm.rman_subdiv_scheme == "none")
-        use_smooth_normals = getattr(rm, 'rman_smoothnormals', False)
-        get_normals = (rman_sg_mesh.is_subdiv == 0 and not use_smooth_normals)
-        if use_subdiv_modifer:
-            # always get the normals when we're using the subdiv modifier
-            get_normals = True
-        rman_mesh = mesh_utils.get_mesh(mesh, get_normals=get_normals)
-        nverts = rman_mesh.nverts
-        verts = rman_mesh.verts
-        P = rman_mesh.P
-        N = rman_mesh.N
+        if payload is None:
+            payload = self.gather_payload(ob, mesh)
+
+        # if the material indices haven't changed since the last update
+        # (ex: a deform only edit), re-use the face sets from last time
+        if not payload.processed and rman_sg_mesh.mat_faces is not None and payload.material_ids is not None:
+            if np.array_equal(rman_sg_mesh.material_ids, payload.material_ids):
+                payload.mat_faces = rman_sg_mesh.mat_faces
+        payload.process()
+        rman_sg_mesh.material_ids = payload.material_ids
+        rman_sg_mesh.mat_faces = payload.mat_faces
+
+        rman_sg_mesh.is_subdiv = payload.is_subdiv
+        use_subdiv_modifer = payload.use_subdiv_modifier
+        nverts = payload.nverts
+        verts = payload.verts
+        P = payload.P
+        N = payload.N
         
         # if this is empty continue:
-        if nverts == []:
-            if not input_mesh:
+        if len(nverts) == 0:
+            if clear_mesh:
                 ob.to_mesh_clear()
             rman_sg_mesh.npoints = 0
             rman_sg_mesh.npolys = 0
@@ -483,7 +555,7 @@ class RmanMeshTranslator(RmanTranslator):
         rman_sg_mesh.nverts = numnverts
 
         sg_node.Define( npolys, npoints, numnverts )
-        rman_sg_mesh.is_multi_material = _is_multi_material_(ob, mesh)
+        rman_sg_mesh.is_multi_material = _is_multi_material_(ob, payload)
             
         primvar = sg_node.GetPrimVars()
         primvar.Clear()
@@ -491,14 +563,14 @@ class RmanMeshTranslator(RmanTranslator):
         if rman_sg_mesh.is_deforming and len(rman_sg_mesh.deform_motion_steps) > 1:
             super().set_primvar_times(rman_sg_mesh.deform_motion_steps, primvar)
         
-        primvar.SetPointDetail(self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")
-        _get_primvars_(ob, rman_sg_mesh, mesh, primvar)   
+        primvar_utils.set_primvar_detail(primvar, 'SetPointDetail', self.rman_scene.rman.Tokens.Rix.k_P, P, "vertex")
+        _get_primvars_(ob, rman_sg_mesh, mesh, primvar, payload)
 
-        primvar.SetIntegerDetail(self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, nverts, "uniform")
-        primvar.SetIntegerDetail(self.rman_scene.rman.Tokens.Rix.k_Ri_vertices, verts, "facevarying")                  
+        primvar_utils.set_primvar_detail(primvar, 'SetIntegerDetail', self.rman_scene.rman.Tokens.Rix.k_Ri_nvertices, nverts, "uniform")
+        primvar_utils.set_primvar_detail(primvar, 'SetIntegerDetail', self.rman_scene.rman.Tokens.Rix.k_Ri_vertices, verts, "facevarying")
 
         if rman_sg_mesh.is_subdiv:
-            creases = self._get_subd_tags_(ob, mesh, primvar)
+            self._get_subd_tags_(payload, primvar)
             if use_subdiv_modifer:
                 # we were tagged as a subdiv by a modifier
                 # use bilinear
@@ -510,20 +582,16 @@ class RmanMeshTranslator(RmanTranslator):
             sg_node.SetScheme(None)
 
         if not rman_sg_mesh.is_subdiv or use_subdiv_modifer:
-            if N:
-                if len(N) == numnverts:
-                    primvar.SetNormalDetail(self.rman_scene.rman.Tokens.Rix.k_N, N, "facevarying")         
-                else:
-                    primvar.SetNormalDetail(self.rman_scene.rman.Tokens.Rix.k_N, N, "uniform")         
+            if payload.N_detail:
+                primvar_utils.set_primvar_detail(primvar, 'SetNormalDetail', self.rman_scene.rman.Tokens.Rix.k_N, N, payload.N_detail)
         subdiv_scheme = getattr(rm, 'rman_subdiv_scheme', 'none')
         rman_sg_mesh.subdiv_scheme = subdiv_scheme
 
         super().export_object_primvars(ob, primvar)
 
         if rman_sg_mesh.is_multi_material:
-            material_ids = _get_material_ids(ob, mesh)
             i = 1
-            mat_faces_dict = _get_mats_faces_(nverts, material_ids)
+            mat_faces_dict = payload.mat_faces
             min_idx = min(mat_faces_dict.keys()) # find the minimun material index
             for mat_id, faces in mat_faces_dict.items():
                 # If the face has a mat index that is higher than the number of
@@ -538,7 +606,7 @@ class RmanMeshTranslator(RmanTranslator):
                 sg_material = self.rman_scene.rman_materials.get(mat.original, None)
 
                 if mat_id == min_idx:
-                    primvar.SetIntegerArray(self.rman_scene.rman.Tokens.Rix.k_shade_faceset, faces, len(faces))
+                    primvar_utils.set_array(primvar, 'SetIntegerArray', self.rman_scene.rman.Tokens.Rix.k_shade_faceset, faces)
                     scenegraph_utils.set_material(sg_node, sg_material.sg_node, sg_material, mat=mat, ob=ob)
                 else:                
                     sg_sub_mesh =  self.rman_scene.sg_scene.CreateMesh("%s-%d" % (rman_sg_mesh.db_name, i))
@@ -550,7 +618,7 @@ class RmanMeshTranslator(RmanTranslator):
                     if rman_sg_mesh.is_deforming and len(rman_sg_mesh.deform_motion_steps) > 1:
                         super().set_primvar_times(rman_sg_mesh.deform_motion_steps, pvars)
                     pvars.Inherit(primvar)
-                    pvars.SetIntegerArray(self.rman_scene.rman.Tokens.Rix.k_shade_faceset, faces, len(faces))                    
+                    primvar_utils.set_array(pvars, 'SetIntegerArray', self.rman_scene.rman.Tokens.Rix.k_shade_faceset, faces)
                     sg_sub_mesh.SetPrimVars(pvars)
                     scenegraph_utils.set_material(sg_sub_mesh, sg_material.sg_node, sg_material, mat=mat, ob=ob)
                     sg_node.AddChild(sg_sub_mesh)
@@ -560,7 +628,7 @@ class RmanMeshTranslator(RmanTranslator):
 
         sg_node.SetPrimVars(primvar)
 
-        if not input_mesh:
+        if clear_mesh:
             ob.to_mesh_clear()  
 
         return True    
\ No newline at end of file
@@ -4,8 +4,6 @@ from ..rfb_utils import property_utils
 from ..rfb_utils import string_utils
 from ..rfb_utils import object_utils
 from ..rfb_utils import prefs_utils
-from ..rfb_utils import shadergraph_utils
-from ..rfb_utils import scene_utils
 import hashlib
 import os
 import bpy
@@ -162,42 +160,15 @@ class RmanTranslator(object):
         rman_sg_node.sg_node.SetAttributes(attrs)     
 
     def export_light_linking_attributes(self, ob, attrs): 
-        rm = ob.renderman
-        bl_scene = self.rman_scene.bl_scene
-        all_lightfilters = [string_utils.sanitize_node_name(l.name) for l in scene_utils.get_all_lightfilters(bl_scene)]
-
-        if self.rman_scene.bl_scene.renderman.invert_light_linking:
-            lighting_subset = []
-            lightfilter_subset = []
-            all_lights = [string_utils.sanitize_node_name(l.name) for l in scene_utils.get_all_lights(bl_scene, include_light_filters=False)]
-            for ll in self.rman_scene.bl_scene.renderman.light_links:
-                light_ob = ll.light_ob                
-                light_props = shadergraph_utils.get_rman_light_properties_group(light_ob)
-                found = False
-                for member in ll.members:
-                    if member.ob_pointer.original == ob.original:
-                        found = True
-                        break
-                    
-                if light_props.renderman_light_role == 'RMAN_LIGHT':
-                    nm = string_utils.sanitize_node_name(light_ob.name)
-                    if found:
-                        lighting_subset.append(nm)
-                    all_lights.remove(nm)
-
-                elif light_props.renderman_light_role == 'RMAN_LIGHTFILTER':      
-                    nm = string_utils.sanitize_node_name(light_ob.name)                  
-                    if found:                        
-                        lightfilter_subset.append(nm)
-                    all_lightfilters.remove(nm)
-
-            if lighting_subset:
-                lighting_subset = lighting_subset + all_lights # include all other lights that are not linked
-                attrs.SetString(self.rman_scene.rman.Tokens.Rix.k_lighting_subset, ','. join(lighting_subset) )
-
-            if lightfilter_subset:
-                lightfilter_subset = lightfilter_subset + all_lightfilters
-                attrs.SetString(self.rman_scene.rman.Tokens.Rix.k_lightfilter_subset, ',' . join(lightfilter_subset))
+        if not self.rman_scene.bl_scene.renderman.invert_light_linking:
+            return
+
+        lighting_subset, lightfilter_subset = self.rman_scene.get_light_link_subsets(ob)
+        if lighting_subset:
+            attrs.SetString(self.rman_scene.rman.Tokens.Rix.k_lighting_subset, lighting_subset)
+
+        if lightfilter_subset:
+            attrs.SetString(self.rman_scene.rman.Tokens.Rix.k_lightfilter_subset, lightfilter_subset)
 
     def export_object_attributes_attrs(self, ob, attrs, remove=True):
 
@@ -210,17 +181,14 @@ class RmanTranslator(object):
 
         obj_groups_str = "World"
         obj_groups_str += "," + name
-        lpe_groups_str = "*"
-        for obj_group in self.rman_scene.bl_scene.renderman.object_groups:
-            for member in obj_group.members:
-                if member.ob_pointer.original == ob.original:
-                    obj_groups_str += ',' + obj_group.name
-                    lpe_groups_str += ',' + obj_group.name
-                    break
+        groups_str = self.rman_scene.get_object_groups(ob)
+        if groups_str:
+            obj_groups_str += ',' + groups_str
         attrs.SetString(self.rman_scene.rman.Tokens.Rix.k_grouping_membership, obj_groups_str)
 
         # add to trace sets
-        if lpe_groups_str != '*':                       
+        if groups_str:
+            lpe_groups_str = '*,' + groups_str
             attrs.SetString(self.rman_scene.rman.Tokens.Rix.k_identifier_lpegroup, lpe_groups_str)
       
         self.export_light_linking_attributes(ob, attrs)